@@ -1,5 +1,6 @@
 import os
 import json
+from functools import cached_property
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -21,13 +22,141 @@ class Settings(BaseSettings):
         "ctx": "web6dot0",
     }
 
+    # Request deadlines (seconds); clients may shorten via X-Request-Timeout
+    upstream_timeout: float = 15.0
+    request_deadline_default: float = 20.0
+    request_deadlines: dict = {
+        "/search": 8.0,
+        "/recommendations": 10.0,
+        "/podcasts": 8.0,
+    }
+
+    # Admission control (per worker): shed requests with 503 once in-flight
+    # requests or pending upstream calls pass a limit. Low-priority routes
+    # and speculative prefetches are shed first (at low_priority_fraction
+    # of the limits), normal routes at the limits, critical ones never.
+    admission_enabled: bool = True
+    admission_max_in_flight: int = 200
+    admission_max_upstream: int = 500
+    admission_low_priority_fraction: float = 0.5
+    admission_retry_after: int = 2
+    admission_priorities: dict = {
+        "/podcasts": "low",
+        "/home": "low",
+        "/metadata": "low",
+        "/song/": "critical",
+        "/stream/": "critical",
+        "/user/": "critical",
+        "/auth/": "critical",
+        "/health": "critical",
+    }
+
+    # Tracing: Server-Timing spans per request, slow requests logged
+    tracing_enabled: bool = True
+    trace_slow_threshold_ms: float = 2000
+
+    # Event-loop lag monitor (per worker): sample interval, stall threshold
+    # for stack capture, and minimum seconds between stack logs
+    loop_monitor_enabled: bool = False
+    loop_monitor_interval: float = 0.5
+    loop_monitor_threshold: float = 0.2
+    loop_monitor_log_interval: float = 30
+
+    # Rate limiting: token buckets per uid (authenticated) or client IP.
+    # Costs weight paths by expected upstream fan-out. Set a Redis URL to
+    # share buckets across workers (requires the `redis` package).
+    rate_limit_enabled: bool = True
+    rate_limit_capacity: int = 60
+    rate_limit_refill_per_sec: float = 1.0
+    rate_limit_costs: dict = {
+        "/search": 5,
+        "/recommendations": 4,
+        "/podcasts": 3,
+        "/album": 3,
+        "/playlist": 3,
+        "/artist": 2,
+        # Per call; /batch also charges each item's own cost
+        "/batch": 1,
+    }
+    rate_limit_redis_url: Optional[str] = None
+    rate_limit_trust_proxy: bool = False
+
+    # Language-filtered search: extra upstream pages fetched to fill a page
+    search_fill_max_pages: int = 5
+    search_fill_concurrency: int = 3
+    search_fill_time_budget: float = 5.0
+
+    # Search result cache (keyed by normalized query) and background
+    # prewarming of the most searched queries
+    search_cache_size: int = 2000
+    search_cache_ttl: float = 300
+    search_prewarm_enabled: bool = True
+    search_prewarm_interval: float = 240
+    search_prewarm_top_k: int = 50
+    search_prewarm_concurrency: int = 4
+    search_popularity_max_queries: int = 10000
+
+    # Offline activity replay (POST /user/activity/batch): events per request
+    activity_batch_max_events: int = 500
+
+    # Activity compaction: background trim of searches and history; trimmed
+    # plays not yet in the listening stats are counted there. Retention is the newest
+    # N entries plus an optional max age (0 disables). Enable on one worker.
+    compaction_enabled: bool = False
+    compaction_interval: float = 6 * 3600
+    compaction_search_retention: int = 200
+    compaction_history_retention: int = 500
+    compaction_max_age_days: float = 0
+    compaction_concurrency: int = 4
+    compaction_batch_size: int = 250
+
+    # Playback WebSocket (/ws/playback): position updates are persisted
+    # (and pushed to other devices) at most once per interval
+    playback_position_write_interval: float = 15
+
+    # Multiplexed GETs (/batch): sub-requests per call, and paths that
+    # can't be batched (streaming or non-JSON responses)
+    batch_max_requests: int = 20
+    batch_excluded_prefixes: list = ["/batch", "/stream", "/ws"]
+
+    # Audio streaming proxy (/stream/{song_id}); off by default
+    stream_proxy_enabled: bool = False
+    stream_default_quality: str = "320kbps"
+    stream_cache_dir: str = ".cache/audio"
+    stream_cache_max_bytes: int = 1024 * 1024 * 1024
+    stream_segment_size: int = 256 * 1024
+    stream_source_ttl: float = 1800
+
+    # Home feed: shelves rebuilt in the background for /home
+    home_feed_enabled: bool = True
+    home_feed_refresh_interval: float = 600
+    home_feed_shelf_size: int = 20
+    home_feed_languages: str = "Hindi,English,Punjabi,Tamil,Telugu"
+
+    # Caches
+    negative_cache_size: int = 20000
+    negative_cache_ttl: float = 120
+    skip_index_max_users: int = 10000
+    user_cache_size: int = 10000
+    user_cache_ttl: float = 300
+    lyrics_cache_size: int = 5000
+    lyrics_cache_ttl: float = 24 * 3600
+    lyrics_negative_ttl: float = 3600
+    lyrics_prefetch_count: int = 3
+    collection_cache_size: int = 500
+    collection_cache_ttl: float = 600
+    artist_cache_size: int = 1000
+    artist_cache_ttl: float = 600
+
     # Server
     app_env: str = "development"
     allowed_origins: str = "*"
+    # Fast start: defer Firebase init and credential loading to first use
+    fast_start: bool = False
 
-    @property
+    @cached_property
     def firebase_credentials(self) -> Optional[dict]:
-        """Load Firebase credentials from file (dev) or env JSON string (prod)."""
+        """Load Firebase credentials from file (dev) or env JSON string (prod). Read once."""
         if self.firebase_credentials_path and os.path.exists(self.firebase_credentials_path):
             try:
                 with open(self.firebase_credentials_path, "r") as f:
@@ -55,9 +184,10 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# Startup log
-if settings.firebase_credentials:
-    print("✅ Firebase credentials loaded")
-else:
-    print("⚠️  Firebase credentials not found — auth will not work")
-    print("   Set FIREBASE_CREDENTIALS_PATH (local) or FIREBASE_SERVICE_ACCOUNT_JSON (prod)")
+# Startup log (skipped in fast-start mode, where credentials load on first use)
+if not settings.fast_start:
+    if settings.firebase_credentials:
+        print("✅ Firebase credentials loaded")
+    else:
+        print("⚠️  Firebase credentials not found — auth will not work")
+        print("   Set FIREBASE_CREDENTIALS_PATH (local) or FIREBASE_SERVICE_ACCOUNT_JSON (prod)")
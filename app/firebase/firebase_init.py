@@ -1,11 +1,12 @@
-import firebase_admin
-from firebase_admin import credentials, db as rtdb
 import logging
 
 logger = logging.getLogger(__name__)
 
 _firebase_app = None
 
+# firebase_admin pulls in google-auth, requests, grpc etc. (~100 ms), so it
+# is imported on first use rather than at module import.
+
 
 def initialize_firebase() -> bool:
     """Initialize Firebase Admin SDK. Returns True on success."""
@@ -14,6 +15,8 @@ def initialize_firebase() -> bool:
     if _firebase_app:
         return True
 
+    import firebase_admin
+    from firebase_admin import credentials
     from app.config import settings
 
     creds = settings.firebase_credentials
@@ -34,5 +37,9 @@ def initialize_firebase() -> bool:
 
 
 def get_db_ref(path: str):
-    """Get a Firebase Realtime Database reference."""
+    """Get a Firebase Realtime Database reference (initializing Firebase if needed)."""
+    from firebase_admin import db as rtdb
+
+    if not _firebase_app:
+        initialize_firebase()
     return rtdb.reference(path)
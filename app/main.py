@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.tracing import TracingMiddleware, TracedJSONResponse
 import logging
 
 # ── Logging ─────────────────────────────────────────────────────────────────
@@ -18,8 +22,29 @@ app = FastAPI(
     title="Music Streaming API",
     description="Backend for the Music Streaming Application — search, stream, recommendations, and user activity.",
     version="1.0.0",
+    default_response_class=TracedJSONResponse,
 )
 
+# Middleware runs outermost-last: CORS wraps everything so 429s and 503s
+# still carry CORS headers, shed requests are rejected before any other
+# work, tracing sees rate-limit auth time, and rejected requests never
+# start a deadline.
+
+# Per-request deadline for upstream calls (see app/middleware/deadline.py)
+app.add_middleware(DeadlineMiddleware)
+
+# Token-bucket rate limiting (see app/middleware/rate_limit.py)
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
+# Request IDs and Server-Timing spans (see app/middleware/tracing.py)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
+# Load shedding by route priority (see app/middleware/admission.py)
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +52,10 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After",
+        "Server-Timing", "X-Request-ID",
+    ],
 )
 
 
@@ -35,6 +64,28 @@ app.add_middleware(
 async def startup():
     logger.info("🚀 Starting Music Streaming API...")
 
+    if settings.loop_monitor_enabled:
+        from app.services import loop_monitor_service
+        loop_monitor_service.start()
+
+    if settings.home_feed_enabled:
+        from app.services import home_service
+        home_service.start()
+
+    if settings.search_prewarm_enabled:
+        from app.services import search_service
+        search_service.start()
+
+    if settings.compaction_enabled:
+        from app.services import compaction_service
+        compaction_service.start()
+
+    if settings.fast_start:
+        # Firebase initializes on first auth/database use instead
+        logger.info("⚡ Fast start: deferring Firebase initialization")
+        logger.info("✅ Startup complete")
+        return
+
     try:
         from app.firebase.firebase_init import initialize_firebase
         ok = initialize_firebase()
@@ -46,9 +97,32 @@ async def startup():
     logger.info("✅ Startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    if settings.loop_monitor_enabled:
+        from app.services import loop_monitor_service
+        loop_monitor_service.stop()
+
+    if settings.home_feed_enabled:
+        from app.services import home_service
+        home_service.stop()
+
+    if settings.search_prewarm_enabled:
+        from app.services import search_service
+        search_service.stop()
+
+    if settings.compaction_enabled:
+        from app.services import compaction_service
+        compaction_service.stop()
+
+    if settings.stream_proxy_enabled:
+        from app.services import stream_service
+        await stream_service.close()
+
+
 # ── Register Routes ─────────────────────────────────────────────────────────
 try:
-    from app.routes import auth, search, songs, recommendations, activity, preferences, metadata, podcasts
+    from app.routes import auth, search, songs, recommendations, activity, preferences, metadata, podcasts, home, playback, batch
 
     app.include_router(auth.router,            prefix="/auth",       tags=["Auth"])
     app.include_router(search.router,                                tags=["Search"])
@@ -58,6 +132,13 @@ try:
     app.include_router(preferences.router,      prefix="/user",      tags=["User"])
     app.include_router(metadata.router,         prefix="/metadata",  tags=["Metadata"])
     app.include_router(podcasts.router,                                tags=["Podcasts"])
+    app.include_router(home.router,                                    tags=["Home"])
+    app.include_router(playback.router,                                tags=["Playback"])
+    app.include_router(batch.router,                                   tags=["Batch"])
+
+    if settings.stream_proxy_enabled:
+        from app.routes import stream
+        app.include_router(stream.router,                              tags=["Stream"])
 
     logger.info("✅ All routes loaded")
 except Exception as e:
@@ -76,4 +157,16 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "version": "1.0.0"}
+    from app.services import saavn_service
+
+    result = {"status": "healthy", "version": "1.0.0", "negativeCache": saavn_service.negative_cache_stats()}
+    if settings.admission_enabled:
+        from app.middleware import admission
+        result["admission"] = admission.stats()
+    if settings.loop_monitor_enabled:
+        from app.services import loop_monitor_service
+        result["loopLag"] = loop_monitor_service.stats()
+    if settings.compaction_enabled:
+        from app.services import compaction_service
+        result["compaction"] = compaction_service.last_run()
+    return result
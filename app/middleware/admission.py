@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.config import settings
+
+LOW, NORMAL, CRITICAL = "low", "normal", "critical"
+
+# Work currently held by this worker
+_in_flight = 0
+_upstream = 0
+_shed = {LOW: 0, NORMAL: 0, "speculative": 0}
+
+
+@contextmanager
+def upstream_call():
+    """Count an upstream call as pending while the block runs."""
+    global _upstream
+    _upstream += 1
+    try:
+        yield
+    finally:
+        _upstream -= 1
+
+
+@contextmanager
+def in_flight():
+    """Count a request (or a /batch sub-request) as in flight while the block runs."""
+    global _in_flight
+    _in_flight += 1
+    try:
+        yield
+    finally:
+        _in_flight -= 1
+
+
+def route_priority(path: str) -> str:
+    """Priority of a path (longest matching prefix), default normal."""
+    priority, best = NORMAL, -1
+    for prefix, value in settings.admission_priorities.items():
+        if path.startswith(prefix) and len(prefix) > best:
+            priority, best = value, len(prefix)
+    return priority
+
+
+def overloaded(priority: str = NORMAL) -> bool:
+    """Whether work of this priority should be turned away right now."""
+    if not settings.admission_enabled or priority == CRITICAL:
+        return False
+    scale = settings.admission_low_priority_fraction if priority == LOW else 1.0
+    return (
+        _in_flight >= settings.admission_max_in_flight * scale
+        or _upstream >= settings.admission_max_upstream * scale
+    )
+
+
+def shed_speculative() -> bool:
+    """Whether optional background work (prefetches) should be skipped."""
+    if overloaded(LOW):
+        _shed["speculative"] += 1
+        return True
+    return False
+
+
+def stats() -> dict:
+    return {"inFlight": _in_flight, "upstream": _upstream, "shed": dict(_shed)}
+
+
+class AdmissionMiddleware(BaseHTTPMiddleware):
+    """Count in-flight requests and shed lower-priority ones under load."""
+
+    async def dispatch(self, request: Request, call_next):
+        priority = route_priority(request.url.path)
+        if request.method != "OPTIONS" and overloaded(priority):
+            # Counted rather than logged: a spike would flood the logs
+            _shed[priority] = _shed.get(priority, 0) + 1
+            return JSONResponse(
+                status_code=503,
+                content={"success": False, "message": "Server busy, please retry shortly"},
+                headers={"Retry-After": str(settings.admission_retry_after)},
+            )
+
+        with in_flight():
+            return await call_next(request)
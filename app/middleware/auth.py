@@ -1,12 +1,43 @@
-from fastapi import Header, HTTPException, Depends
-from firebase_admin import auth as firebase_auth
+from fastapi import Header, HTTPException, Depends, Request
 from typing import Optional
+from app.middleware.tracing import span
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def verify_id_token(token: str) -> dict:
+    """Verify a raw Firebase ID token. Raises HTTP 401 if invalid."""
+    # Imported lazily to keep firebase_admin off the startup path
+    from firebase_admin import auth as firebase_auth
+    from app.firebase.firebase_init import initialize_firebase
+
+    initialize_firebase()
+    try:
+        with span("auth"):
+            decoded = firebase_auth.verify_id_token(token)
+        return decoded
+    except firebase_auth.ExpiredIdTokenError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except firebase_auth.InvalidIdTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except Exception as e:
+        logger.error(f"Token verification error: {e}")
+        raise HTTPException(status_code=401, detail="Authentication failed")
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract the token from a 'Bearer <token>' header, or None."""
+    if not authorization:
+        return None
+    parts = authorization.split(" ")
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    return parts[1]
+
+
 async def verify_firebase_token(
+    request: Request,
     authorization: Optional[str] = Header(None),
 ) -> dict:
     """
@@ -15,29 +46,28 @@ async def verify_firebase_token(
     Expects header: Authorization: Bearer <id_token>
     Returns the decoded token claims (uid, email, name, picture, etc.)
     Raises HTTP 401 if invalid or missing.
+
+    Claims already verified earlier in the request (e.g. by the rate
+    limiter) are reused from `request.state.firebase_user`.
     """
     if not authorization:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
 
-    parts = authorization.split(" ")
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    token = bearer_token(authorization)
+    if not token:
         raise HTTPException(status_code=401, detail="Invalid Authorization format. Use 'Bearer <token>'")
 
-    token = parts[1]
+    cached = getattr(request.state, "firebase_user", None)
+    if cached:
+        return cached
 
-    try:
-        decoded = firebase_auth.verify_id_token(token)
-        return decoded
-    except firebase_auth.ExpiredIdTokenError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except firebase_auth.InvalidIdTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        logger.error(f"Token verification error: {e}")
-        raise HTTPException(status_code=401, detail="Authentication failed")
+    decoded = verify_id_token(token)
+    request.state.firebase_user = decoded
+    return decoded
 
 
 async def optional_firebase_token(
+    request: Request,
     authorization: Optional[str] = Header(None),
 ) -> Optional[dict]:
     """
@@ -48,6 +78,6 @@ async def optional_firebase_token(
         return None
 
     try:
-        return await verify_firebase_token(authorization)
+        return await verify_firebase_token(request, authorization)
     except HTTPException:
         return None
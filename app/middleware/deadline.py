@@ -0,0 +1,115 @@
+import time
+import logging
+import contextvars
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class RequestDeadline:
+    """Absolute deadline for one request, shared by every task it spawns."""
+
+    __slots__ = ("expires_at", "partial")
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        # Set when some upstream work was cut short or skipped
+        self.partial = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+_current: ContextVar[Optional[RequestDeadline]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None outside a request."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def upstream_timeout(default: float) -> float:
+    """Timeout for one upstream call: the default, capped by the time left."""
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+def expired() -> bool:
+    """True (and the request marked partial) once the deadline has passed."""
+    deadline = _current.get()
+    if deadline and deadline.remaining() <= 0:
+        deadline.partial = True
+        return True
+    return False
+
+
+def mark_partial() -> None:
+    """Flag the current request as partial (e.g. it stopped waiting on shared work)."""
+    deadline = _current.get()
+    if deadline:
+        deadline.partial = True
+
+
+def is_partial() -> bool:
+    deadline = _current.get()
+    return bool(deadline and deadline.partial)
+
+
+def detached_context() -> contextvars.Context:
+    """
+    Copy of the current context without a deadline.
+
+    For shared work that must outlive the caller's budget; everything else
+    (the request trace in particular) is kept.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return context
+
+
+def annotate(result: dict) -> dict:
+    """
+    Flag a response dict as partial if the deadline cut work short.
+
+    Returns a copy when flagging, so cached responses are never modified.
+    """
+    if isinstance(result, dict) and is_partial():
+        return {**result, "partial": True}
+    return result
+
+
+def _budget_for(request: Request) -> float:
+    """Route budget (longest matching prefix), optionally shortened by the client."""
+    budget = settings.request_deadline_default
+    best = -1
+    for prefix, seconds in settings.request_deadlines.items():
+        if request.url.path.startswith(prefix) and len(prefix) > best:
+            budget, best = seconds, len(prefix)
+
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            client = float(header)
+            if client > 0:
+                budget = min(budget, client)
+        except ValueError:
+            pass
+    return budget
+
+
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """Attach a deadline to each request for saavn_service calls to honour."""
+
+    async def dispatch(self, request: Request, call_next):
+        token = _current.set(RequestDeadline(_budget_for(request)))
+        try:
+            return await call_next(request)
+        finally:
+            _current.reset(token)
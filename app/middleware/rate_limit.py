@@ -0,0 +1,189 @@
+import math
+import time
+import logging
+from collections import OrderedDict
+from typing import Tuple
+from fastapi import Request, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
+from app.middleware.auth import bearer_token, verify_id_token
+
+logger = logging.getLogger(__name__)
+
+# Paths that never consume tokens
+EXEMPT_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this worker's memory (LRU-bounded)."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        """Try to take `cost` tokens. Returns (allowed, tokens left)."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+# Refill and take atomically, using the Redis clock so workers agree
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers through Redis (needs `redis`)."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost])
+        return bool(allowed), float(tokens)
+
+
+def _create_store():
+    if settings.rate_limit_redis_url:
+        try:
+            return RedisBucketStore(settings.rate_limit_redis_url)
+        except ImportError:
+            logger.error("rate_limit_redis_url is set but `redis` is not installed — using in-memory buckets")
+    return InMemoryBucketStore()
+
+
+_store = None
+
+
+def get_store():
+    """This worker's bucket store, shared by the middleware and routes that charge extra."""
+    global _store
+    if _store is None:
+        _store = _create_store()
+    return _store
+
+
+def request_cost(path: str) -> float:
+    """Token cost of a path (longest matching prefix), default 1."""
+    cost, best = 1.0, -1
+    for prefix, value in settings.rate_limit_costs.items():
+        if path.startswith(prefix) and len(prefix) > best:
+            cost, best = float(value), len(prefix)
+    return cost
+
+
+def client_ip(request: Request) -> str:
+    if settings.rate_limit_trust_proxy:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def client_key(request: Request) -> str:
+    """
+    Bucket key: Firebase uid for a valid bearer token, else the client IP.
+
+    Verified claims are stored on `request.state` so the auth dependency
+    doesn't verify the same token again.
+    """
+    user = getattr(request.state, "firebase_user", None)
+    if user:
+        return f"uid:{user['uid']}"
+    token = bearer_token(request.headers.get("authorization"))
+    if token:
+        try:
+            user = verify_id_token(token)
+            request.state.firebase_user = user
+            return f"uid:{user['uid']}"
+        except HTTPException:
+            pass
+    return f"ip:{client_ip(request)}"
+
+
+async def charge(request: Request, cost: float, store=None) -> Tuple[bool, dict]:
+    """
+    Take `cost` tokens from the client's bucket.
+
+    Returns (allowed, headers): RateLimit-* headers, plus Retry-After when
+    refused. A failing store allows the request (with no headers) rather
+    than taking the API down.
+    """
+    capacity = float(settings.rate_limit_capacity)
+    rate = settings.rate_limit_refill_per_sec
+    key = client_key(request)
+
+    try:
+        allowed, tokens = await (store or get_store()).take(key, cost, capacity, rate)
+    except Exception as e:
+        logger.error(f"Rate limiter error: {e}")
+        return True, {}
+
+    headers = {
+        "RateLimit-Limit": str(int(capacity)),
+        "RateLimit-Remaining": str(int(tokens)),
+        "RateLimit-Reset": str(math.ceil((capacity - tokens) / rate)),
+    }
+    if not allowed:
+        headers["Retry-After"] = str(math.ceil((cost - tokens) / rate))
+    return allowed, headers
+
+
+def rate_limited(headers: dict, message: str = "Rate limit exceeded") -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "message": message},
+        headers=headers,
+    )
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """Per-client token-bucket rate limiting with RateLimit-* headers."""
+
+    def __init__(self, app, store=None):
+        super().__init__(app)
+        self.store = store or get_store()
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in EXEMPT_PATHS or request.method == "OPTIONS":
+            return await call_next(request)
+
+        cost = min(request_cost(request.url.path), float(settings.rate_limit_capacity))
+        allowed, headers = await charge(request, cost, self.store)
+        if not allowed:
+            return rate_limited(headers)
+
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
@@ -0,0 +1,122 @@
+import json
+import time
+import uuid
+import logging
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class RequestTrace:
+    """Spans recorded while handling one request (shared with its subtasks)."""
+
+    __slots__ = ("request_id", "started", "spans")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: list = []  # (name, duration ms)
+
+    def summary(self) -> dict:
+        """name -> (count, total ms), in first-seen order."""
+        totals: dict = {}
+        for name, duration in self.spans:
+            count, total = totals.get(name, (0, 0.0))
+            totals[name] = (count + 1, total + duration)
+        return totals
+
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def request_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def span(name: str):
+    """Time a block and record it on the current request, if any."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, (time.perf_counter() - start) * 1000))
+
+
+def traced(name: str):
+    """Decorator form of `span` for plain (sync) functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse that records its encoding time as an `encode` span."""
+
+    def render(self, content) -> bytes:
+        with span("encode"):
+            return super().render(content)
+
+
+def _server_timing(trace: RequestTrace, total_ms: float) -> str:
+    parts = [
+        f'{name};dur={duration:.1f};desc="{count}x"' if count > 1 else f"{name};dur={duration:.1f}"
+        for name, (count, duration) in trace.summary().items()
+    ]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """
+    Attach a request ID and span list to each request.
+
+    Spans come back in a Server-Timing header; requests slower than
+    `trace_slow_threshold_ms` also get a structured log line.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        rid = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        trace = RequestTrace(rid)
+        token = _current.set(trace)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = (time.perf_counter() - trace.started) * 1000
+        response.headers[REQUEST_ID_HEADER] = rid
+        response.headers["Server-Timing"] = _server_timing(trace, total_ms)
+
+        if total_ms >= settings.trace_slow_threshold_ms:
+            logger.warning(json.dumps({
+                "event": "slow_request",
+                "request_id": rid,
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "total_ms": round(total_ms, 1),
+                "spans": {
+                    name: {"count": count, "ms": round(duration, 1)}
+                    for name, (count, duration) in trace.summary().items()
+                },
+            }))
+        return response
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class BatchItem(BaseModel):
+    path: str
+    id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem]
@@ -1,3 +1,4 @@
+import sys
 from pydantic import BaseModel
 from typing import Optional
 
@@ -55,3 +56,127 @@ class SongSearchResult(BaseModel):
 class SearchResponse(BaseModel):
     success: bool
     data: Optional[dict] = None
+
+
+# ── Compact representation ──────────────────────────────────────────────────
+#
+# Caches can hold hundreds of thousands of songs, and raw upstream dicts
+# cost several KB each (a dict per image, download URL and artist). The
+# compact form uses slots and tuples, and interns strings that repeat
+# across songs (languages, qualities, roles, artist names and IDs).
+
+_INTERN_KEYS = ("type", "language", "label", "year")
+# Canonical artist tuples, so the same artist is stored once across songs
+_artist_pool: dict = {}
+_ARTIST_POOL_MAX = 200_000
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pack_links(items) -> tuple:
+    """[{quality, url}, ...] -> ((quality, url), ...) with interned qualities."""
+    return tuple(
+        (_intern(i.get("quality")), i.get("url"))
+        for i in items or [] if isinstance(i, dict)
+    )
+
+
+def _unpack_links(links: tuple) -> list:
+    return [{"quality": q, "url": u} for q, u in links]
+
+
+def _pack_artist(a: dict) -> tuple:
+    packed = (
+        _intern(a.get("id")),
+        _intern(a.get("name")),
+        _intern(a.get("role")),
+        _intern(a.get("type")),
+        a.get("url"),
+        _pack_links(a.get("image")),
+    )
+    if len(_artist_pool) > _ARTIST_POOL_MAX:
+        _artist_pool.clear()
+    return _artist_pool.setdefault(packed, packed)
+
+
+def _unpack_artist(a: tuple) -> dict:
+    return {
+        "id": a[0], "name": a[1], "role": a[2], "type": a[3], "url": a[4],
+        "image": _unpack_links(a[5]),
+    }
+
+
+class CompactSong:
+    """
+    Memory-compact, immutable-by-convention form of an upstream song dict.
+
+    `from_api` / `to_api` round-trip the Saavn song shape (camelCase keys);
+    unknown keys are kept in `extra`, null scalar fields are omitted.
+    """
+
+    __slots__ = (
+        "id", "name", "type", "year", "release_date", "duration", "label",
+        "explicit_content", "play_count", "language", "has_lyrics", "lyrics_id",
+        "url", "copyright", "album", "artists", "image", "download_url", "extra",
+    )
+
+    _FIELDS = {
+        "id": "id", "name": "name", "type": "type", "year": "year",
+        "releaseDate": "release_date", "duration": "duration", "label": "label",
+        "explicitContent": "explicit_content", "playCount": "play_count",
+        "language": "language", "hasLyrics": "has_lyrics", "lyricsId": "lyrics_id",
+        "url": "url", "copyright": "copyright",
+    }
+    _STRUCTURED = ("album", "artists", "image", "downloadUrl")
+
+    @classmethod
+    def from_api(cls, data: dict) -> "CompactSong":
+        song = cls.__new__(cls)
+        for key, attr in cls._FIELDS.items():
+            value = data.get(key)
+            setattr(song, attr, _intern(value) if key in _INTERN_KEYS else value)
+
+        album = data.get("album")
+        song.album = (
+            (album.get("id"), _intern(album.get("name")), album.get("url"))
+            if isinstance(album, dict) else None
+        )
+
+        artists = data.get("artists")
+        song.artists = (
+            tuple(
+                (_intern(group), tuple(_pack_artist(a) for a in artists.get(group) or [] if isinstance(a, dict)))
+                for group in ("primary", "featured", "all") if group in artists
+            )
+            if isinstance(artists, dict) else None
+        )
+
+        song.image = _pack_links(data.get("image"))
+        song.download_url = _pack_links(data.get("downloadUrl"))
+
+        extra = {k: v for k, v in data.items() if k not in cls._FIELDS and k not in cls._STRUCTURED}
+        song.extra = extra or None
+        return song
+
+    def to_api(self) -> dict:
+        data = {}
+        for key, attr in self._FIELDS.items():
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        if self.album is not None:
+            data["album"] = {"id": self.album[0], "name": self.album[1], "url": self.album[2]}
+        if self.artists is not None:
+            data["artists"] = {group: [_unpack_artist(a) for a in items] for group, items in self.artists}
+        data["image"] = _unpack_links(self.image)
+        data["downloadUrl"] = _unpack_links(self.download_url)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def is_playable(self) -> bool:
+        return bool(self.download_url)
+
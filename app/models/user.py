@@ -18,6 +18,7 @@ class ActivityHistory(BaseModel):
     song_id: str
     song_name: Optional[str] = None
     artist: Optional[str] = None
+    language: Optional[str] = None
     played_at: Optional[str] = None
     duration: Optional[int] = None
 
@@ -30,7 +31,7 @@ class ActivitySkipped(BaseModel):
 
 class ActivitySearch(BaseModel):
     query: str
-    timestamp: Optional[str] = None
+    timestamp: Optional[int] = None  # epoch ms; ordered numerically for `since`
 
 
 class CurrentPlaying(BaseModel):
@@ -38,3 +39,19 @@ class CurrentPlaying(BaseModel):
     song_name: Optional[str] = None
     artist: Optional[str] = None
     position: Optional[int] = 0
+    has_lyrics: Optional[bool] = None
+
+
+class ActivityEvent(BaseModel):
+    """
+    One queued activity event. `type` is history, skipped, search or
+    current; `data` is validated against that type's model. `timestamp`
+    (epoch ms) is when the event happened on the device.
+    """
+    type: str
+    data: dict = {}
+    timestamp: Optional[int] = None
+
+
+class ActivityBatch(BaseModel):
+    events: list[ActivityEvent]
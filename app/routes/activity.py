@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
+from typing import Optional
 from app.middleware.auth import verify_firebase_token
-from app.services import firebase_service
-from app.models.user import ActivityHistory, ActivitySkipped, ActivitySearch, CurrentPlaying
+from app.config import settings
+from app.services import firebase_service, skip_service, lyrics_service, activity_service, stats_service, search_service, playback_service
+from app.models.user import ActivityHistory, ActivitySkipped, ActivitySearch, CurrentPlaying, ActivityBatch
 
 router = APIRouter()
 
@@ -21,11 +23,25 @@ async def save_history(
 async def get_history(
     user: dict = Depends(verify_firebase_token),
     limit: int = 50,
+    since: Optional[str] = None,
 ):
-    """Get user's play history."""
+    """
+    Get user's play history.
+
+    Pass the returned `cursor` as `since` to receive only entries played
+    after it. `hasMore` means another page is waiting.
+    """
     uid = user["uid"]
-    history = firebase_service.get_history(uid, limit=limit)
-    return {"success": True, "data": history or {}}
+    try:
+        history = firebase_service.get_history(uid, limit=limit, since=since)
+    except ValueError:
+        return {"success": False, "message": "Invalid cursor"}
+    return {
+        "success": True,
+        "data": history or {},
+        "cursor": firebase_service.sync_cursor(history, "playedAt", since),
+        "hasMore": since is not None and len(history or {}) >= limit,
+    }
 
 
 @router.post("/activity/skipped")
@@ -36,6 +52,8 @@ async def save_skipped(
     """Save a skipped song."""
     uid = user["uid"]
     success = firebase_service.save_skipped(uid, data.song_id, data.model_dump())
+    if success:
+        skip_service.record_skip(uid, data.song_id)
     return {"success": success}
 
 
@@ -47,6 +65,7 @@ async def save_search(
     """Save a search query."""
     uid = user["uid"]
     success = firebase_service.save_search(uid, data.model_dump())
+    search_service.record_query(data.query)
     return {"success": success}
 
 
@@ -54,11 +73,20 @@ async def save_search(
 async def get_searches(
     user: dict = Depends(verify_firebase_token),
     limit: int = 20,
+    since: Optional[str] = None,
 ):
-    """Get user's search history."""
+    """Get user's search history. Supports `since` like `/activity/history`."""
     uid = user["uid"]
-    searches = firebase_service.get_searches(uid, limit=limit)
-    return {"success": True, "data": searches or {}}
+    try:
+        searches = firebase_service.get_searches(uid, limit=limit, since=since)
+    except ValueError:
+        return {"success": False, "message": "Invalid cursor"}
+    return {
+        "success": True,
+        "data": searches or {},
+        "cursor": firebase_service.sync_cursor(searches, "timestamp", since),
+        "hasMore": since is not None and len(searches or {}) >= limit,
+    }
 
 
 @router.post("/activity/current")
@@ -68,10 +96,35 @@ async def save_current(
 ):
     """Save currently playing song."""
     uid = user["uid"]
-    success = firebase_service.save_current_playing(uid, data.model_dump())
+    current = data.model_dump()
+    success = firebase_service.save_current_playing(uid, current)
+    if success:
+        playback_service.publish_current(uid, current)
+    lyrics_service.prefetch_lyrics([current], count=1)
     return {"success": success}
 
 
+@router.post("/activity/batch")
+async def save_batch(
+    data: ActivityBatch,
+    user: dict = Depends(verify_firebase_token),
+):
+    """
+    Replay queued activity events in one request.
+
+    Accepts `{"events": [{"type", "data", "timestamp"}, ...]}` where `type`
+    is history, skipped, search or current and `data` is that endpoint's
+    body. Valid events are stored together; `results` reports each event.
+    """
+    if len(data.events) > settings.activity_batch_max_events:
+        return {
+            "success": False,
+            "message": f"Too many events (max {settings.activity_batch_max_events})",
+        }
+    uid = user["uid"]
+    return activity_service.apply_batch(uid, data.events)
+
+
 @router.get("/activity/current")
 async def get_current(
     user: dict = Depends(verify_firebase_token),
@@ -80,3 +133,15 @@ async def get_current(
     uid = user["uid"]
     current = firebase_service.get_current_playing(uid)
     return {"success": True, "data": current}
+
+
+@router.get("/stats")
+async def get_stats(
+    user: dict = Depends(verify_firebase_token),
+    limit: int = 10,
+):
+    """Get the user's listening stats: play totals and top artists, languages and songs."""
+    uid = user["uid"]
+    stats = firebase_service.get_stats(uid)
+    songs = firebase_service.get_top_songs(uid, limit=limit)
+    return {"success": True, "data": stats_service.summarize(stats, limit=limit, songs=songs)}
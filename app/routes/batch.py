@@ -0,0 +1,120 @@
+import asyncio
+import json
+from typing import Optional
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, Request
+from starlette.exceptions import HTTPException
+from app.config import settings
+from app.middleware import admission, rate_limit
+from app.middleware.auth import optional_firebase_token
+from app.models.batch import BatchItem, BatchRequest
+from app.services import saavn_service
+
+router = APIRouter()
+
+# Parent scope keys the routed app relies on (exception handlers, FastAPI's
+# dependency exit stacks) that the middleware stack would normally set
+_INHERITED_SCOPE_PREFIXES = ("starlette.", "fastapi")
+
+
+def _sub_scope(request: Request, path: str, query: str, user: Optional[dict]) -> dict:
+    scope = {k: v for k, v in request.scope.items() if k.startswith(_INHERITED_SCOPE_PREFIXES)}
+    scope.update({
+        "type": "http",
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        # Same headers (Authorization included) as the batch itself
+        "headers": [(k, v) for k, v in request.scope["headers"] if k != b"content-length"],
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "app": request.scope.get("app"),
+        # Claims verified once for the batch; the auth dependency reuses them
+        "state": {"firebase_user": user} if user else {},
+    })
+    return scope
+
+
+async def _dispatch(request: Request, item: BatchItem, user: Optional[dict]) -> dict:
+    """Run one GET through the app's router in-process and capture its response."""
+    url = urlsplit(item.path)
+    result = {"id": item.id, "path": item.path}
+    if not url.path.startswith("/") or url.scheme or url.netloc:
+        return {**result, "status": 400, "body": {"success": False, "message": "Path must be relative, e.g. /song/123"}}
+    if url.path.startswith(tuple(settings.batch_excluded_prefixes)):
+        return {**result, "status": 400, "body": {"success": False, "message": "Path can't be batched"}}
+    if admission.overloaded(admission.route_priority(url.path)):
+        return {**result, "status": 503, "body": {"success": False, "message": "Server busy, please retry shortly"}}
+
+    status = 500
+    headers = []
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        with admission.in_flight():
+            await request.app.router(_sub_scope(request, url.path, url.query, user), receive, send)
+    except HTTPException as e:
+        # Raised by the router itself (e.g. unknown path), outside route handlers
+        return {**result, "status": e.status_code, "body": {"detail": e.detail}}
+    except Exception as e:
+        return {**result, "status": 500, "body": {"success": False, "message": f"Sub-request failed: {e}"}}
+
+    raw = b"".join(chunks)
+    content_type = dict(headers).get(b"content-type", b"").decode()
+    if content_type.startswith("application/json") and raw:
+        body = json.loads(raw)
+    else:
+        body = raw.decode(errors="replace")
+    return {**result, "status": status, "body": body}
+
+
+@router.post("/batch")
+async def batch(
+    data: BatchRequest,
+    request: Request,
+    user: Optional[dict] = Depends(optional_firebase_token),
+):
+    """
+    Run several GET requests in one call.
+
+    Body: `{"requests": [{"id": "song", "path": "/song/123"}, ...]}`. Items
+    run concurrently in-process under this request's auth and deadline,
+    and share song lookups so the same song is only fetched once. Each
+    result carries its own `status` and `body`, in request order. The
+    batch is rate limited as the sum of its items' costs.
+    """
+    if len(data.requests) > settings.batch_max_requests:
+        return {"success": False, "message": f"Too many requests (max {settings.batch_max_requests})"}
+
+    if settings.rate_limit_enabled:
+        # Sub-requests skip the middleware stack, so charge what they would
+        # have cost on their own (the middleware only charged for /batch)
+        cost = sum(rate_limit.request_cost(urlsplit(item.path).path) for item in data.requests)
+        if cost > settings.rate_limit_capacity:
+            return rate_limit.rate_limited({}, "Batch costs more than the rate limit allows; split it up")
+        allowed, headers = await rate_limit.charge(request, cost)
+        if not allowed:
+            return rate_limit.rate_limited(headers)
+
+    with saavn_service.shared_song_lookups():
+        results = await asyncio.gather(*(_dispatch(request, item, user) for item in data.requests))
+
+    return {
+        "success": all(200 <= r["status"] < 300 for r in results),
+        "results": results,
+    }
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
+from app.middleware.auth import optional_firebase_token
+from app.services import home_service
+
+router = APIRouter()
+
+
+@router.get("/home")
+async def get_home(
+    for_you: bool = Query(False, description="Include a personalized recommendations shelf"),
+    user: Optional[dict] = Depends(optional_firebase_token),
+):
+    """
+    Home screen shelves: trending, latest podcasts and per-language songs.
+
+    Shelves are prebuilt in the background; anonymous requests get the
+    pre-encoded feed, signed-in users get it reordered and filtered.
+    """
+    if not user:
+        return Response(content=await home_service.get_feed_json(), media_type="application/json")
+    return await home_service.get_personalized_feed(user["uid"], for_you=for_you)
@@ -0,0 +1,98 @@
+import json
+import time
+import logging
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Query
+from pydantic import ValidationError
+from app.middleware.auth import verify_id_token, bearer_token
+from app.models.user import ActivityHistory, ActivitySkipped, CurrentPlaying
+from app.services import playback_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Close codes in the 4000-4999 application range
+CLOSE_UNAUTHORIZED = 4401
+
+
+async def _handle(websocket: WebSocket, uid: str, message: dict) -> dict:
+    """Apply one client event and build its ack."""
+    kind = message.get("type")
+    data = message.get("data") or {}
+    try:
+        if kind == "play":
+            current = CurrentPlaying.model_validate(data).model_dump()
+            history = ActivityHistory.model_validate(data).model_dump()
+            success = await playback_service.play(uid, current, history, websocket)
+        elif kind == "position":
+            value = data.get("position")
+            if not isinstance(value, int) or value < 0:
+                return {"type": "error", "message": "position must be a non-negative integer"}
+            success = await playback_service.position(uid, value, websocket)
+        elif kind == "skip":
+            skipped = ActivitySkipped.model_validate(data)
+            success = await playback_service.skip(uid, skipped.song_id, skipped.model_dump())
+        else:
+            return {"type": "error", "message": f"Unknown event type '{kind}'"}
+    except ValidationError as e:
+        first = e.errors()[0]
+        field = ".".join(str(part) for part in first.get("loc", ())) or "data"
+        return {"type": "error", "message": f"{field}: {first.get('msg', 'invalid')}"}
+    return {"type": "ack", "success": success}
+
+
+@router.websocket("/ws/playback")
+async def playback_socket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="Firebase ID token (browsers can't set WebSocket headers)"),
+):
+    """
+    Playback channel for one device.
+
+    Authenticate with `?token=<id_token>` or an `Authorization: Bearer`
+    header; the token is verified once. Send `{"type": "play" | "position"
+    | "skip", "data": {...}, "id": ...}`; each event is acked with the same
+    `id`. The server sends `{"type": "current", "data": ...}` on connect
+    and whenever another of the user's devices changes what is playing.
+    The socket is closed with 4401 when the token expires.
+    """
+    token = token or bearer_token(websocket.headers.get("authorization"))
+    if not token:
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+    try:
+        user = verify_id_token(token)
+    except HTTPException:
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+
+    uid = user["uid"]
+    expires_at = user.get("exp")
+    await websocket.accept()
+    playback_service.register(uid, websocket)
+    try:
+        await websocket.send_json({"type": "current", "data": await playback_service.get_current(uid)})
+        while True:
+            raw = await websocket.receive_text()
+            if expires_at and time.time() >= expires_at:
+                await websocket.send_json({"type": "error", "message": "Token expired"})
+                await websocket.close(code=CLOSE_UNAUTHORIZED)
+                break
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "message": "Expected a JSON object"})
+                continue
+            reply = await _handle(websocket, uid, message)
+            if "id" in message:
+                reply["id"] = message["id"]
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Playback socket for {uid} closed: {e}")
+    finally:
+        await playback_service.unregister(uid, websocket)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from typing import Optional
-from app.services import saavn_service
+from app.middleware import deadline
+from app.middleware.auth import optional_firebase_token
+from app.services import saavn_service, skip_service
 
 router = APIRouter()
 
@@ -10,6 +12,7 @@ async def get_podcasts(
     q: str = Query("latest", description="Search query for podcasts"),
     page: int = Query(0),
     limit: int = Query(10),
+    user: Optional[dict] = Depends(optional_firebase_token),
 ):
     """
     Get podcast episodes.
@@ -19,9 +22,13 @@ async def get_podcasts(
     if result and result.get("success"):
         data = result.get("data", {})
         results = data.get("results", [])
+
+        # Hide episodes the user skipped before paying for enrichment
+        uid = user.get("uid") if user else None
+        results = skip_service.filter_skipped(uid, results)
         
         # Enrich results with download URLs for playback
         data["results"] = await saavn_service.enrich_songs(results)
-        return result
+        return deadline.annotate(result)
 
     return {"success": False, "message": "No podcasts found"}
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
 from typing import Optional
+from app.middleware import deadline
 from app.middleware.auth import optional_firebase_token
-from app.services import recommendation_service
+from app.services import recommendation_service, lyrics_service
 
 router = APIRouter()
 
@@ -24,7 +25,8 @@ async def get_recommendations(
     result = await recommendation_service.get_recommendations(
         song_id=song_id, uid=uid, limit=limit
     )
-    return result
+    lyrics_service.prefetch_lyrics(result.get("data", []))
+    return deadline.annotate(result)
 
 
 @router.get("/recommendations/{song_id}")
@@ -38,4 +40,5 @@ async def get_recommendations_for_song(
     result = await recommendation_service.get_recommendations(
         song_id=song_id, uid=uid, limit=limit
     )
-    return result
+    lyrics_service.prefetch_lyrics(result.get("data", []))
+    return deadline.annotate(result)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query
 from typing import Optional
-from app.services import saavn_service
+from app.middleware import deadline
+from app.services import search_service
 
 router = APIRouter()
 
@@ -12,36 +13,25 @@ async def search(
     language: Optional[str] = Query(None, description="Filter by language"),
     page: int = Query(0, description="Page number"),
     limit: int = Query(20, description="Results per page"),
+    cursor: Optional[str] = Query(None, description="Continuation cursor from a previous language-filtered song search"),
 ):
     """
     Search for music content.
+
+    Song searches with a language filter page upstream until `limit`
+    matches are found and return `nextCursor` to continue from. Results
+    are cached by normalized query, so case and spacing don't matter.
     """
-    if type == "songs":
-        result = await saavn_service.search_songs(q, page=page, limit=limit)
-        # Apply language filter if provided and search results exist
-        if result and result.get("success"):
-            data = result.get("data", {})
-            results = data.get("results", [])
-            
-            if language:
-                results = [
-                    s for s in results 
-                    if s.get("language", "").lower() == language.lower()
-                ]
-            
-            # Enrich results with download URLs
-            data["results"] = await saavn_service.enrich_songs(results)
-            
-    elif type == "albums":
-        result = await saavn_service.search_albums(q, page=page, limit=limit)
-    elif type == "artists":
-        result = await saavn_service.search_artists(q, page=page, limit=limit)
-    else:
-        result = await saavn_service.global_search(q, language=language, limit=limit)
+    try:
+        result = await search_service.search(
+            q, type=type, language=language, page=page, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        return {"success": False, "message": "Invalid cursor"}
 
     if result:
-        return result
+        return deadline.annotate(result)
 
-    return {"success": False, "message": "No results found"}
+    return deadline.annotate({"success": False, "message": "No results found"})
 
 
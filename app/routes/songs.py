@@ -1,5 +1,8 @@
-from fastapi import APIRouter
-from app.services import saavn_service
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.middleware import deadline
+from app.middleware.auth import optional_firebase_token
+from app.services import saavn_service, skip_service, lyrics_service, collection_service, artist_service
 
 router = APIRouter()
 
@@ -16,37 +19,46 @@ async def get_song(song_id: str):
 @router.get("/song/{song_id}/lyrics")
 async def get_lyrics(song_id: str):
     """Get lyrics for a song."""
-    result = await saavn_service.get_song_lyrics(song_id)
+    result = await lyrics_service.get_lyrics(song_id)
     if result:
         return result
-    return {"success": False, "message": "Lyrics not found"}
+    return deadline.annotate({"success": False, "message": "Lyrics not found"})
 
 
 @router.get("/song/{song_id}/suggestions")
-async def get_suggestions(song_id: str):
+async def get_suggestions(
+    song_id: str,
+    user: Optional[dict] = Depends(optional_firebase_token),
+):
     """Get similar songs / suggestions."""
     result = await saavn_service.get_song_suggestions(song_id)
     if result:
+        uid = user.get("uid") if user else None
+        if uid and isinstance(result.get("data"), list):
+            result["data"] = skip_service.filter_skipped(uid, result["data"])
+        if isinstance(result.get("data"), list):
+            lyrics_service.prefetch_lyrics(result["data"])
         return result
     return {"success": False, "message": "No suggestions found"}
 
 
 @router.get("/album/{album_id}")
-async def get_album(album_id: str):
+async def get_album(
+    album_id: str,
+    offset: int = Query(0, description="First song to return"),
+    limit: Optional[int] = Query(None, description="Number of songs to return (all if omitted)"),
+):
     """Get album details and songs."""
-    result = await saavn_service.get_album_by_id(album_id)
-    if result and result.get("success"):
-        data = result.get("data", {})
-        if "songs" in data:
-            data["songs"] = await saavn_service.enrich_songs(data["songs"])
-        return result
+    result = await collection_service.get_window("album", album_id, offset=offset, limit=limit)
+    if result:
+        return deadline.annotate(result)
     return {"success": False, "message": "Album not found"}
 
 
 @router.get("/artist/{artist_id}")
 async def get_artist(artist_id: str):
     """Get artist details."""
-    result = await saavn_service.get_artist_by_id(artist_id)
+    result = await artist_service.get_details(artist_id)
     if result and result.get("success"):
         # Some detail responses might include top songs
         return result
@@ -56,23 +68,44 @@ async def get_artist(artist_id: str):
 @router.get("/artist/{artist_id}/songs")
 async def get_artist_songs(artist_id: str, page: int = 0):
     """Get songs by a specific artist."""
-    result = await saavn_service.get_artist_songs(artist_id, page=page)
+    result = await artist_service.get_songs(artist_id, page=page)
     if result and result.get("success"):
-        data = result.get("data", [])
-        if isinstance(data, list):
-            enriched = await saavn_service.enrich_songs(data)
-            result["data"] = enriched
-        return result
+        return deadline.annotate(result)
     return {"success": False, "message": "No songs found"}
 
 
-@router.get("/playlist/{playlist_id}")
-async def get_playlist(playlist_id: str):
-    """Get playlist details and songs."""
-    result = await saavn_service.get_playlist_by_id(playlist_id)
+@router.get("/artist/{artist_id}/albums")
+async def get_artist_albums(artist_id: str, page: int = 0):
+    """Get albums by a specific artist."""
+    result = await artist_service.get_albums(artist_id, page=page)
     if result and result.get("success"):
-        data = result.get("data", {})
-        if "songs" in data:
-            data["songs"] = await saavn_service.enrich_songs(data["songs"])
         return result
+    return {"success": False, "message": "No albums found"}
+
+
+@router.get("/artist/{artist_id}/page")
+async def get_artist_page(artist_id: str):
+    """
+    Artist details, enriched songs and albums in one response.
+
+    Sections are fetched concurrently. If songs or albums can't be loaded
+    they are null and named in `errors`; the page fails only without the
+    artist details.
+    """
+    result = await artist_service.get_page(artist_id)
+    if result:
+        return deadline.annotate(result)
+    return {"success": False, "message": "Artist not found"}
+
+
+@router.get("/playlist/{playlist_id}")
+async def get_playlist(
+    playlist_id: str,
+    offset: int = Query(0, description="First song to return"),
+    limit: Optional[int] = Query(None, description="Number of songs to return (all if omitted)"),
+):
+    """Get playlist details and songs."""
+    result = await collection_service.get_window("playlist", playlist_id, offset=offset, limit=limit)
+    if result:
+        return deadline.annotate(result)
     return {"success": False, "message": "Playlist not found"}
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional
+from app.services import stream_service
+
+router = APIRouter()
+
+
+@router.get("/stream/{song_id}")
+async def stream_song(
+    song_id: str,
+    quality: Optional[str] = Query(None, description="Preferred quality, e.g. 160kbps or 320kbps"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+):
+    """
+    Proxy a song's audio with HTTP Range support.
+
+    Audio is fetched from the CDN in fixed-size segments that are cached
+    on disk, so popular tracks are served locally.
+    """
+    try:
+        source = await stream_service.open_stream(song_id, quality)
+    except stream_service.StreamError as e:
+        return JSONResponse(status_code=404, content={"success": False, "message": str(e)})
+
+    total = source["size"]
+    try:
+        byte_range = stream_service.parse_range(range_header, total)
+    except ValueError:
+        return JSONResponse(
+            status_code=416,
+            content={"success": False, "message": "Range not satisfiable"},
+            headers={"Content-Range": f"bytes */{total}"},
+        )
+
+    start, end = byte_range or (0, total - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+    return StreamingResponse(
+        stream_service.iter_range(source, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=source["content_type"],
+        headers=headers,
+    )
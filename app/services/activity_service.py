@@ -0,0 +1,120 @@
+import re
+import time
+import logging
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError
+from app.models.user import ActivityEvent, ActivityHistory, ActivitySkipped, ActivitySearch, CurrentPlaying
+from app.services import firebase_service, skip_service, lyrics_service, search_service, stats_service, playback_service
+
+logger = logging.getLogger(__name__)
+
+_EVENT_MODELS = {
+    "history": ActivityHistory,
+    "skipped": ActivitySkipped,
+    "search": ActivitySearch,
+    "current": CurrentPlaying,
+}
+
+# Characters RTDB does not allow in keys
+_INVALID_KEY = re.compile(r"[.$#\[\]/]")
+
+
+def _event_time(event: ActivityEvent, now: int) -> int:
+    """Device timestamp of an event, clamped so clock skew can't date it in the future."""
+    if not event.timestamp or event.timestamp <= 0:
+        return now
+    return min(event.timestamp, now)
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first.get("loc", ())) or "data"
+    return f"{field}: {first.get('msg', 'invalid')}"
+
+
+def _build_write(event: ActivityEvent, item: BaseModel, now: int) -> tuple:
+    """(path relative to activity/, value) for one validated event."""
+    data = item.model_dump()
+    at = _event_time(event, now)
+    if event.type == "history":
+        data["playedAt"] = at
+        data[stats_service.COUNTED] = True
+        return f"history/{item.song_id}", data
+    if event.type == "skipped":
+        data["skippedAt"] = at
+        return f"skipped/{item.song_id}", data
+    if event.type == "search":
+        data["timestamp"] = at
+        return f"searches/{firebase_service.push_id(at)}", data
+    return "currentPlaying", data
+
+
+def apply_batch(uid: str, events: List[ActivityEvent]) -> dict:
+    """
+    Validate and store a batch of queued activity events.
+
+    Each event is validated on its own; valid ones are written in a single
+    multi-path update, so they all land or none do. Events are applied in
+    order, so a later `current` (or a later play of the same song) wins.
+    Returns per-event results in request order.
+    """
+    now = int(time.time() * 1000)
+    updates = {}
+    results = []
+    accepted = []
+    skipped_ids = []
+    plays = []
+    queries = []
+    current: Optional[dict] = None
+
+    for index, event in enumerate(events):
+        model = _EVENT_MODELS.get(event.type)
+        if model is None:
+            results.append({"index": index, "success": False, "error": f"Unknown event type '{event.type}'"})
+            continue
+        try:
+            item = model.model_validate(event.data)
+        except ValidationError as e:
+            results.append({"index": index, "success": False, "error": _validation_message(e)})
+            continue
+
+        song_id = getattr(item, "song_id", None)
+        if song_id is not None and (not song_id or _INVALID_KEY.search(song_id)):
+            # One bad key would make RTDB reject the whole update
+            results.append({"index": index, "success": False, "error": "song_id: invalid key"})
+            continue
+
+        path, value = _build_write(event, item, now)
+        updates[path] = value
+        accepted.append(len(results))
+        results.append({"index": index, "success": True})
+        if event.type == "history":
+            plays.append(value)
+        elif event.type == "skipped":
+            skipped_ids.append(song_id)
+        elif event.type == "search":
+            queries.append(item.query)
+        elif event.type == "current":
+            current = value
+
+    if updates and not firebase_service.save_activity_batch(uid, updates, plays=plays):
+        for i in accepted:
+            results[i] = {"index": results[i]["index"], "success": False, "error": "Write failed"}
+        accepted = []
+
+    if accepted:
+        for song_id in skipped_ids:
+            skip_service.record_skip(uid, song_id)
+        for query in queries:
+            search_service.record_query(query)
+        if current:
+            playback_service.publish_current(uid, current)
+            lyrics_service.prefetch_lyrics([current], count=1)
+        logger.info(f"📥 Activity batch for {uid}: {len(accepted)}/{len(events)} events stored")
+
+    return {
+        "success": len(accepted) == len(events),
+        "accepted": len(accepted),
+        "rejected": len(events) - len(accepted),
+        "results": results,
+    }
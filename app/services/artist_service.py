@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Optional, List, Dict
+from app.config import settings
+from app.middleware import deadline
+from app.services import saavn_service
+from app.services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (section, artist_id, page) -> successful upstream response; song lists
+# are stored enriched. Shared by the single-section routes and /page.
+_cache = TTLCache(maxsize=settings.artist_cache_size, ttl=settings.artist_cache_ttl)
+
+# Sections the artist page can't be rendered without; the others degrade
+# to null with an entry in `errors`.
+REQUIRED_SECTIONS = ("artist",)
+
+
+def _items(data, key: str) -> List[Dict]:
+    """Song/album list from a response that is either a list or {key: [...]}."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get(key), list):
+        return data[key]
+    return []
+
+
+async def _cached(key: tuple, fetch) -> Optional[dict]:
+    """Cached section response; a shallow copy, so callers can't alter the cache."""
+    result = _cache.get(key)
+    if result is not None:
+        return dict(result)
+    result = await fetch()
+    if result and result.get("success") and not deadline.is_partial():
+        _cache.set(key, result)
+        return dict(result)
+    return result
+
+
+async def get_details(artist_id: str) -> Optional[dict]:
+    """Artist details (cached)."""
+    return await _cached(("artist", artist_id, 0), lambda: saavn_service.get_artist_by_id(artist_id))
+
+
+async def get_songs(artist_id: str, page: int = 0) -> Optional[dict]:
+    """Artist songs, enriched with download URLs (cached)."""
+    async def fetch():
+        result = await saavn_service.get_artist_songs(artist_id, page=page)
+        if result and result.get("success"):
+            data = result.get("data")
+            enriched = await saavn_service.enrich_songs(_items(data, "songs"))
+            if isinstance(data, dict):
+                result["data"] = {**data, "songs": enriched}
+            else:
+                result["data"] = enriched
+        return result
+
+    return await _cached(("songs", artist_id, page), fetch)
+
+
+async def get_albums(artist_id: str, page: int = 0) -> Optional[dict]:
+    """Artist albums (cached)."""
+    return await _cached(("albums", artist_id, page), lambda: saavn_service.get_artist_albums(artist_id, page=page))
+
+
+async def get_page(artist_id: str) -> Optional[dict]:
+    """
+    Everything an artist screen needs: details, enriched songs and albums.
+
+    The three sections are fetched concurrently (song enrichment starts as
+    soon as the song list arrives). Returns None if a required section
+    failed; optional sections that failed are null and listed in `errors`.
+    """
+    sections = ("artist", "songs", "albums")
+    results = await asyncio.gather(
+        get_details(artist_id),
+        get_songs(artist_id),
+        get_albums(artist_id),
+        return_exceptions=True,
+    )
+
+    data = {}
+    errors = {}
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Artist page section {name} failed for {artist_id}: {result}")
+            result = None
+        if not result or not result.get("success"):
+            if name in REQUIRED_SECTIONS:
+                return None
+            data[name] = None
+            errors[name] = "unavailable"
+            continue
+        section = result.get("data")
+        if name == "songs":
+            section = _items(section, "songs")
+        elif name == "albums":
+            section = _items(section, "albums")
+        data[name] = section
+
+    page = {"success": True, "data": data}
+    if errors:
+        page["errors"] = errors
+    return page
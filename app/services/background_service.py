@@ -0,0 +1,36 @@
+import asyncio
+import contextvars
+import logging
+from typing import Coroutine, Optional
+from app.middleware import admission
+
+logger = logging.getLogger(__name__)
+
+# Strong references so fire-and-forget tasks aren't garbage collected mid-run
+_tasks: set = set()
+
+
+def _on_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc:
+        logger.warning(f"Background task {task.get_name()} failed: {exc}")
+
+
+def spawn(coro: Coroutine, name: Optional[str] = None, speculative: bool = False) -> Optional[asyncio.Task]:
+    """
+    Run a coroutine in the background without awaiting it.
+
+    The task gets a fresh context so it is not bound by (or reported as
+    part of) the request that happened to start it. Speculative work
+    (prefetches) is dropped, returning None, while the worker is shedding load.
+    """
+    if speculative and admission.shed_speculative():
+        coro.close()
+        return None
+    task = asyncio.create_task(coro, name=name, context=contextvars.Context())
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
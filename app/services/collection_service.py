@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Optional, Dict
+from app.config import settings
+from app.models.song import CompactSong
+from app.services import saavn_service, background_service
+from app.services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (kind, id) -> {"result": response without songs, "songs": [CompactSong]}.
+# Enriched windows are written back, so they stay enriched for later requests.
+_cache = TTLCache(maxsize=settings.collection_cache_size, ttl=settings.collection_cache_ttl)
+# (kind, id, offset, limit) -> speculative enrichment of that window
+_prefetches: Dict[tuple, asyncio.Task] = {}
+
+_FETCHERS = {
+    "album": "get_album_by_id",
+    "playlist": "get_playlist_by_id",
+}
+
+
+async def _load(kind: str, collection_id: str) -> Optional[dict]:
+    key = (kind, collection_id)
+    entry = _cache.get(key)
+    if entry is None:
+        result = await getattr(saavn_service, _FETCHERS[kind])(collection_id)
+        if not result or not result.get("success"):
+            return None
+        data = result.get("data")
+        data = data if isinstance(data, dict) else {}
+        songs = [CompactSong.from_api(s) for s in data.get("songs", []) if isinstance(s, dict)]
+        entry = {
+            "result": {**result, "data": {k: v for k, v in data.items() if k != "songs"}},
+            "songs": songs,
+        }
+        _cache.set(key, entry)
+    return entry
+
+
+async def _enrich_range(songs: list, start: int, end: int) -> list:
+    """Enrich songs[start:end] and write playable results back to the cache."""
+    window = await saavn_service.enrich_songs([s.to_api() for s in songs[start:end]])
+    for i, song in enumerate(window):
+        if not songs[start + i].is_playable and song.get("downloadUrl"):
+            songs[start + i] = CompactSong.from_api(song)
+    return window
+
+
+def _prefetch(kind: str, collection_id: str, songs: list, offset: int, limit: int) -> None:
+    key = (kind, collection_id, offset, limit)
+    if key in _prefetches:
+        return
+    task = background_service.spawn(
+        _enrich_range(songs, offset, offset + limit),
+        name=f"prefetch-{kind}-{collection_id}-{offset}",
+        speculative=True,
+    )
+    if task is None:
+        return
+    _prefetches[key] = task
+    task.add_done_callback(lambda _: _prefetches.pop(key, None))
+
+
+async def get_window(
+    kind: str,
+    collection_id: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Get an album or playlist with only `songs[offset:offset + limit]` enriched.
+
+    The full track list is cached, so later windows don't refetch the
+    collection. When a limit is given, the following window is enriched
+    speculatively in the background. Without a limit every song is
+    enriched (the original behaviour).
+    """
+    entry = await _load(kind, collection_id)
+    if not entry:
+        return None
+
+    result = entry["result"]
+    data = result["data"]
+    songs = entry["songs"]
+    offset = max(offset, 0)
+    end = len(songs) if limit is None else offset + max(limit, 0)
+
+    # Reuse a speculative enrichment of this window if one is running
+    pending = _prefetches.get((kind, collection_id, offset, limit))
+    if pending:
+        await asyncio.shield(pending)
+
+    window = await _enrich_range(songs, offset, end)
+
+    if limit and end < len(songs):
+        _prefetch(kind, collection_id, songs, end, limit)
+
+    return {
+        **result,
+        "data": {
+            **data,
+            "songs": window,
+            "offset": offset,
+            "limit": limit,
+            "total": len(songs),
+        },
+    }
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Optional, List, Dict, Tuple
+from app.config import settings
+from app.services import firebase_service, background_service, stats_service
+
+logger = logging.getLogger(__name__)
+
+_runner: Optional[asyncio.Task] = None
+_last_run: Optional[dict] = None
+
+
+def _chunks(items: List, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _apply(uid: str, groups: List[Tuple[Dict, Optional[Dict]]]) -> int:
+    """
+    Write (paths, play to count or None) groups in batched multi-path
+    updates. Returns groups written.
+    """
+    written = 0
+    for chunk in _chunks(groups, settings.compaction_batch_size):
+        updates = {}
+        plays = []
+        for paths, play in chunk:
+            updates.update(paths)
+            if play:
+                plays.append(play)
+        if not firebase_service.save_activity_batch(uid, updates, plays=plays, backfill=True):
+            break
+        written += len(chunk)
+    return written
+
+
+def _expired_searches(uid: str, cutoff: Optional[int]) -> List[str]:
+    """Search keys beyond the retention count or older than `cutoff`."""
+    keys = firebase_service.get_activity_keys(uid, "searches")
+    if not keys:
+        return []
+    # Push keys sort chronologically, so no data needs to be read
+    keys.sort()
+    excess = max(len(keys) - settings.compaction_search_retention, 0)
+    expired = keys[:excess]
+    if cutoff is not None:
+        for key in keys[excess:]:
+            ts = firebase_service.push_id_time(key)
+            if ts is None or ts > cutoff:
+                break
+            expired.append(key)
+    return expired
+
+
+def _expired_history(uid: str, cutoff: Optional[int]) -> Dict[str, dict]:
+    """History entries beyond the retention count or played before `cutoff`."""
+    keys = firebase_service.get_activity_keys(uid, "history")
+    if not keys:
+        return {}
+    excess = max(len(keys) - settings.compaction_history_retention, 0)
+    if not excess and cutoff is None:
+        return {}
+    return firebase_service.get_oldest_history(uid, count=excess, before=cutoff) or {}
+
+
+def _fold(song_id: str, entry: dict) -> Tuple[Dict, Optional[Dict]]:
+    """
+    Remove one history entry. Plays saved before listening stats existed
+    aren't counted yet, so they are added to the stats as they go.
+    """
+    paths = {f"history/{song_id}": None}
+    if isinstance(entry, dict) and not entry.get(stats_service.COUNTED):
+        return paths, {**entry, "song_id": song_id}
+    return paths, None
+
+
+def compact_user(uid: str) -> dict:
+    """
+    Trim one user's searches and history to the retention settings.
+
+    Blocking (RTDB calls); run it in a thread. An uncounted history entry
+    is deleted in the same update that adds it to the stats, so a failed
+    batch never loses plays.
+    """
+    cutoff = None
+    if settings.compaction_max_age_days > 0:
+        cutoff = int((time.time() - settings.compaction_max_age_days * 86400) * 1000)
+
+    searches = _expired_searches(uid, cutoff)
+    removed_searches = _apply(uid, [({f"searches/{key}": None}, None) for key in searches])
+
+    history = _expired_history(uid, cutoff)
+    folded = _apply(uid, [_fold(song_id, entry) for song_id, entry in history.items()])
+
+    return {"searches": removed_searches, "history": folded}
+
+
+async def run_once() -> dict:
+    """Compact every user with bounded concurrency."""
+    started = time.perf_counter()
+    uids = await asyncio.to_thread(firebase_service.list_user_ids)
+    semaphore = asyncio.Semaphore(settings.compaction_concurrency)
+
+    async def _one(uid: str) -> dict:
+        async with semaphore:
+            return await asyncio.to_thread(compact_user, uid)
+
+    results = await asyncio.gather(*(_one(uid) for uid in uids), return_exceptions=True)
+
+    summary = {"users": len(uids), "failed": 0, "searches": 0, "history": 0}
+    for uid, result in zip(uids, results):
+        if isinstance(result, Exception):
+            summary["failed"] += 1
+            logger.warning(f"Compaction failed for {uid}: {result}")
+            continue
+        summary["searches"] += result["searches"]
+        summary["history"] += result["history"]
+    summary["durationMs"] = round((time.perf_counter() - started) * 1000)
+    summary["finishedAt"] = int(time.time() * 1000)
+
+    logger.info(
+        f"🧹 Compaction: {summary['users']} users, {summary['searches']} searches removed, "
+        f"{summary['history']} history entries folded ({summary['durationMs']} ms)"
+    )
+    return summary
+
+
+async def _run_loop() -> None:
+    global _last_run
+    while True:
+        # First pass one interval after startup, away from deploy traffic
+        await asyncio.sleep(settings.compaction_interval)
+        try:
+            _last_run = await run_once()
+        except Exception as e:
+            logger.error(f"Compaction run failed: {e}")
+
+
+def start() -> None:
+    """Start periodic compaction (call from app startup)."""
+    global _runner
+    if _runner is None or _runner.done():
+        _runner = background_service.spawn(_run_loop(), name="activity-compaction")
+
+
+def stop() -> None:
+    if _runner is not None:
+        _runner.cancel()
+
+
+def last_run() -> Optional[dict]:
+    """Summary of the most recent compaction run, if any."""
+    return _last_run
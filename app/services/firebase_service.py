@@ -1,29 +1,125 @@
 import logging
+import secrets
 import time
-from typing import Optional
+from typing import Optional, Tuple
+from app.config import settings
 from app.firebase.firebase_init import get_db_ref
+from app.middleware.tracing import traced
+from app.services.cache_service import TTLCache
+from app.services import stats_service
 
 logger = logging.getLogger(__name__)
 
+# Read-through caches for small, rarely changing per-user documents. Writes
+# through this module update them in place; the TTL bounds staleness from
+# writes made elsewhere (other workers, the client SDK).
+_profile_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+_preferences_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+_stats_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+_MISSING = object()
+
+# Alphabet of RTDB push keys, in sort order
+_PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+
+def push_id(timestamp_ms: Optional[int] = None) -> str:
+    """
+    Generate a push key locally (8 timestamp chars + 12 random chars).
+
+    Keys sort chronologically like those from `ref.push()`, so writes can
+    be folded into a multi-path update instead of one request each.
+    """
+    ts = int(time.time() * 1000) if timestamp_ms is None else int(timestamp_ms)
+    time_chars = []
+    for _ in range(8):
+        time_chars.append(_PUSH_CHARS[ts % 64])
+        ts //= 64
+    random_chars = "".join(secrets.choice(_PUSH_CHARS) for _ in range(12))
+    return "".join(reversed(time_chars)) + random_chars
+
+
+def push_id_time(key: str) -> Optional[int]:
+    """Timestamp (epoch ms) encoded in a push key, or None if it isn't one."""
+    if len(key) != 20:
+        return None
+    ts = 0
+    for char in key[:8]:
+        value = _PUSH_CHARS.find(char)
+        if value < 0:
+            return None
+        ts = ts * 64 + value
+    return ts
+
+
+# ── Sync Cursors ────────────────────────────────────────────────────────────
+
+def parse_sync_cursor(cursor: str) -> Tuple[int, Optional[str]]:
+    """
+    Split a `timestamp:key` sync cursor. Raises ValueError if malformed.
+
+    A bare timestamp (from older clients) has no key and means "everything
+    at that timestamp was seen".
+    """
+    ts, sep, key = cursor.partition(":")
+    if sep and not key:
+        raise ValueError(cursor)
+    return int(ts), key or None
+
+
+def sync_cursor(entries: Optional[dict], field: str, since: Optional[str]) -> Optional[str]:
+    """Cursor after the last of `entries` in (field, key) order; unchanged if there are none."""
+    last = max(
+        ((entry[field], key) for key, entry in (entries or {}).items()
+         if isinstance(entry, dict) and isinstance(entry.get(field), (int, float))),
+        default=None,
+    )
+    return f"{int(last[0])}:{last[1]}" if last else since
+
+
+def _entries_after(ref, field: str, ts: int, key: Optional[str], limit: int) -> dict:
+    """
+    The first `limit` children in (field, key) order after the cursor.
+
+    RTDB can't resume a child-ordered query from a key, so entries sharing
+    the cursor's timestamp are read with `equal_to` and filtered here;
+    a page boundary splitting them would otherwise skip the rest for good.
+    """
+    later = ref.order_by_child(field).start_at(ts + 1).limit_to_first(limit).get() or {}
+    entries = list(later.items())
+    if key is not None:
+        tied = ref.order_by_child(field).equal_to(ts).get() or {}
+        entries += [(k, v) for k, v in tied.items() if k > key]
+    entries.sort(key=lambda kv: (kv[1].get(field, 0) if isinstance(kv[1], dict) else 0, kv[0]))
+    return dict(entries[:limit])
+
 
 # ── User Profile ────────────────────────────────────────────────────────────
 
+@traced("firebase.save_profile")
 def save_profile(uid: str, data: dict) -> bool:
     """Save or update user profile."""
     try:
         ref = get_db_ref(f"users/{uid}/profile")
         ref.set(data)
+        _profile_cache.set(uid, data)
         return True
     except Exception as e:
         logger.error(f"Error saving profile for {uid}: {e}")
+        _profile_cache.pop(uid)
         return False
 
 
+@traced("firebase.get_profile")
 def get_profile(uid: str) -> Optional[dict]:
-    """Get user profile."""
+    """Get user profile (cached)."""
+    cached = _profile_cache.get(uid, _MISSING)
+    if cached is not _MISSING:
+        return cached
     try:
         ref = get_db_ref(f"users/{uid}/profile")
-        return ref.get()
+        profile = ref.get()
+        _profile_cache.set(uid, profile)
+        return profile
     except Exception as e:
         logger.error(f"Error getting profile for {uid}: {e}")
         return None
@@ -31,22 +127,31 @@ def get_profile(uid: str) -> Optional[dict]:
 
 # ── User Preferences ───────────────────────────────────────────────────────
 
+@traced("firebase.save_preferences")
 def save_preferences(uid: str, data: dict) -> bool:
     """Save user preferences (language, artists)."""
     try:
         ref = get_db_ref(f"users/{uid}/preferences")
         ref.set(data)
+        _preferences_cache.set(uid, data)
         return True
     except Exception as e:
         logger.error(f"Error saving preferences for {uid}: {e}")
+        _preferences_cache.pop(uid)
         return False
 
 
+@traced("firebase.get_preferences")
 def get_preferences(uid: str) -> Optional[dict]:
-    """Get user preferences."""
+    """Get user preferences (cached)."""
+    cached = _preferences_cache.get(uid, _MISSING)
+    if cached is not _MISSING:
+        return cached
     try:
         ref = get_db_ref(f"users/{uid}/preferences")
-        return ref.get()
+        prefs = ref.get()
+        _preferences_cache.set(uid, prefs)
+        return prefs
     except Exception as e:
         logger.error(f"Error getting preferences for {uid}: {e}")
         return None
@@ -54,22 +159,37 @@ def get_preferences(uid: str) -> Optional[dict]:
 
 # ── Activity: History ───────────────────────────────────────────────────────
 
+@traced("firebase.save_history")
 def save_history(uid: str, song_id: str, data: dict) -> bool:
-    """Save a song to play history."""
+    """Save a song to play history and count it in the user's stats."""
     try:
-        ref = get_db_ref(f"users/{uid}/activity/history/{song_id}")
+        ref = get_db_ref(f"users/{uid}")
         data["playedAt"] = data.get("playedAt", int(time.time() * 1000))
-        ref.set(data)
+        data[stats_service.COUNTED] = True
+        updates = {f"activity/history/{song_id}": data}
+        updates.update(stats_service.play_updates([{**data, "song_id": song_id}]))
+        ref.update(updates)
+        _stats_cache.pop(uid)
         return True
     except Exception as e:
         logger.error(f"Error saving history: {e}")
         return False
 
 
-def get_history(uid: str, limit: int = 50) -> Optional[dict]:
-    """Get play history."""
+@traced("firebase.get_history")
+def get_history(uid: str, limit: int = 50, since: Optional[str] = None) -> Optional[dict]:
+    """
+    Get play history.
+
+    With a `since` sync cursor, returns the oldest `limit` entries after it
+    so a client can page forward through everything it missed. Raises
+    ValueError for a malformed cursor.
+    """
+    after = parse_sync_cursor(since) if since is not None else None
     try:
         ref = get_db_ref(f"users/{uid}/activity/history")
+        if after is not None:
+            return _entries_after(ref, "playedAt", *after, limit)
         return ref.order_by_child("playedAt").limit_to_last(limit).get()
     except Exception as e:
         logger.error(f"Error getting history: {e}")
@@ -78,6 +198,7 @@ def get_history(uid: str, limit: int = 50) -> Optional[dict]:
 
 # ── Activity: Skipped ───────────────────────────────────────────────────────
 
+@traced("firebase.save_skipped")
 def save_skipped(uid: str, song_id: str, data: dict) -> bool:
     """Save a skipped song."""
     try:
@@ -90,13 +211,30 @@ def save_skipped(uid: str, song_id: str, data: dict) -> bool:
         return False
 
 
+@traced("firebase.get_skipped")
+def get_skipped(uid: str) -> Optional[dict]:
+    """
+    Get skipped song IDs (shallow: {song_id: True}).
+
+    A user who never skipped gets {}; None means the read failed.
+    """
+    try:
+        ref = get_db_ref(f"users/{uid}/activity/skipped")
+        return ref.get(shallow=True) or {}
+    except Exception as e:
+        logger.error(f"Error getting skipped: {e}")
+        return None
+
+
 # ── Activity: Search History ────────────────────────────────────────────────
 
+@traced("firebase.save_search")
 def save_search(uid: str, data: dict) -> bool:
     """Save a search query."""
     try:
         ref = get_db_ref(f"users/{uid}/activity/searches")
-        data["timestamp"] = data.get("timestamp", int(time.time() * 1000))
+        # model_dump() always has the key, so fill None as well as missing
+        data["timestamp"] = data.get("timestamp") or int(time.time() * 1000)
         ref.push(data)
         return True
     except Exception as e:
@@ -104,18 +242,116 @@ def save_search(uid: str, data: dict) -> bool:
         return False
 
 
-def get_searches(uid: str, limit: int = 20) -> Optional[dict]:
-    """Get search history."""
+@traced("firebase.get_searches")
+def get_searches(uid: str, limit: int = 20, since: Optional[str] = None) -> Optional[dict]:
+    """Get search history. `since` behaves as in `get_history`."""
+    after = parse_sync_cursor(since) if since is not None else None
     try:
         ref = get_db_ref(f"users/{uid}/activity/searches")
+        if after is not None:
+            return _entries_after(ref, "timestamp", *after, limit)
         return ref.order_by_child("timestamp").limit_to_last(limit).get()
     except Exception as e:
         logger.error(f"Error getting searches: {e}")
         return None
 
 
+# ── Activity: Compaction ────────────────────────────────────────────────────
+
+@traced("firebase.list_user_ids")
+def list_user_ids() -> list:
+    """All user IDs (shallow read of `users`)."""
+    try:
+        return list((get_db_ref("users").get(shallow=True) or {}).keys())
+    except Exception as e:
+        logger.error(f"Error listing users: {e}")
+        return []
+
+
+@traced("firebase.get_activity_keys")
+def get_activity_keys(uid: str, kind: str) -> Optional[list]:
+    """Child keys of `activity/{kind}` without their data (shallow)."""
+    try:
+        ref = get_db_ref(f"users/{uid}/activity/{kind}")
+        return list((ref.get(shallow=True) or {}).keys())
+    except Exception as e:
+        logger.error(f"Error listing {kind} for {uid}: {e}")
+        return None
+
+
+@traced("firebase.get_oldest_history")
+def get_oldest_history(uid: str, count: int = 0, before: Optional[int] = None) -> Optional[dict]:
+    """Oldest `count` history entries, plus any played at or before `before`."""
+    try:
+        ref = get_db_ref(f"users/{uid}/activity/history")
+        entries = {}
+        # Queries are built fresh each time: their modifiers mutate in place
+        if count > 0:
+            entries.update(ref.order_by_child("playedAt").limit_to_first(count).get() or {})
+        if before is not None:
+            entries.update(ref.order_by_child("playedAt").end_at(before).get() or {})
+        return entries
+    except Exception as e:
+        logger.error(f"Error getting old history for {uid}: {e}")
+        return None
+
+
+# ── Activity: Batch ─────────────────────────────────────────────────────────
+
+@traced("firebase.save_activity_batch")
+def save_activity_batch(uid: str, updates: dict, plays: Optional[list] = None, backfill: bool = False) -> bool:
+    """
+    Apply several activity writes (paths relative to `activity/`) atomically.
+
+    `plays` are history entries to count in the user's stats in the same
+    update (`backfill` as in `stats_service.play_updates`).
+    """
+    try:
+        ref = get_db_ref(f"users/{uid}")
+        paths = {f"activity/{path}": value for path, value in updates.items()}
+        if plays:
+            paths.update(stats_service.play_updates(plays, backfill=backfill))
+        ref.update(paths)
+        if plays:
+            _stats_cache.pop(uid)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving activity batch for {uid}: {e}")
+        return False
+
+
+# ── Listening Stats ─────────────────────────────────────────────────────────
+
+@traced("firebase.get_stats")
+def get_stats(uid: str) -> Optional[dict]:
+    """Get the user's listening aggregates (cached; one read, per-song counts excluded)."""
+    cached = _stats_cache.get(uid, _MISSING)
+    if cached is not _MISSING:
+        return cached
+    try:
+        ref = get_db_ref(f"users/{uid}/stats")
+        stats = ref.get()
+        _stats_cache.set(uid, stats)
+        return stats
+    except Exception as e:
+        logger.error(f"Error getting stats for {uid}: {e}")
+        return None
+
+
+@traced("firebase.get_top_songs")
+def get_top_songs(uid: str, limit: int = 10) -> Optional[dict]:
+    """The user's `limit` most played songs from songStats."""
+    try:
+        ref = get_db_ref(f"users/{uid}/songStats")
+        return ref.order_by_child("count").limit_to_last(limit).get() or {}
+    except Exception as e:
+        logger.error(f"Error getting top songs for {uid}: {e}")
+        return None
+
+
 # ── Activity: Current Playing ───────────────────────────────────────────────
 
+@traced("firebase.save_current_playing")
 def save_current_playing(uid: str, data: dict) -> bool:
     """Save currently playing song."""
     try:
@@ -127,6 +363,7 @@ def save_current_playing(uid: str, data: dict) -> bool:
         return False
 
 
+@traced("firebase.get_current_playing")
 def get_current_playing(uid: str) -> Optional[dict]:
     """Get currently playing song."""
     try:
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, List, Dict
+from app.config import settings
+from app.services import saavn_service, firebase_service, skip_service, background_service
+
+logger = logging.getLogger(__name__)
+
+# Latest built feed, as a dict and pre-encoded for anonymous requests
+_feed: Optional[dict] = None
+_feed_json: Optional[bytes] = None
+_built_at = 0.0  # time.monotonic() of the last successful build
+_building: Optional[asyncio.Future] = None
+_refresher: Optional[asyncio.Task] = None
+
+
+def _languages() -> List[str]:
+    return [l.strip() for l in settings.home_feed_languages.split(",") if l.strip()]
+
+
+def _songs(response) -> List[Dict]:
+    if isinstance(response, Exception) or not response or not response.get("success"):
+        return []
+    data = response.get("data", {})
+    return data.get("results", []) if isinstance(data, dict) else []
+
+
+async def build_feed() -> dict:
+    """Fetch and enrich every shelf once: trending, latest podcasts, per language."""
+    size = settings.home_feed_shelf_size
+    languages = _languages()
+
+    responses = await asyncio.gather(
+        saavn_service.search_songs("trending", limit=size),
+        saavn_service.search_podcasts("latest", limit=size),
+        *(saavn_service.search_songs_filled(lang, lang, limit=size) for lang in languages),
+        return_exceptions=True,
+    )
+
+    shelves = [
+        {"id": "trending", "title": "Trending", "songs": _songs(responses[0])},
+        {"id": "podcasts", "title": "Latest Podcasts", "songs": _songs(responses[1])},
+    ]
+    for lang, response in zip(languages, responses[2:]):
+        shelves.append({
+            "id": f"language:{lang.lower()}",
+            "title": lang,
+            "language": lang.lower(),
+            "songs": _songs(response),
+        })
+
+    enriched = await asyncio.gather(*(saavn_service.enrich_songs(s["songs"]) for s in shelves))
+    for shelf, songs in zip(shelves, enriched):
+        shelf["songs"] = songs
+
+    return {
+        "success": True,
+        "data": {
+            "shelves": [s for s in shelves if s["songs"]],
+            "updatedAt": int(time.time() * 1000),
+        },
+    }
+
+
+async def refresh() -> None:
+    """Rebuild the feed, keeping the previous one if the rebuild comes back empty."""
+    global _feed, _feed_json, _built_at
+    feed = await build_feed()
+    if not feed["data"]["shelves"] and _feed:
+        logger.warning("Home feed refresh returned no shelves — keeping previous feed")
+        return
+    _feed = feed
+    _feed_json = json.dumps(feed, separators=(",", ":")).encode()
+    _built_at = time.monotonic()
+    logger.info(f"🏠 Home feed refreshed ({len(feed['data']['shelves'])} shelves)")
+
+
+def _start_refresh() -> asyncio.Future:
+    """
+    Start a refresh unless one is already in progress.
+
+    It runs as a background task, so a build started by a request is not
+    cut short by that request's deadline.
+    """
+    global _building
+    if _building is None or _building.done():
+        _building = background_service.spawn(refresh(), name="home-feed-build")
+    return _building
+
+
+async def _shared_refresh() -> None:
+    """Run a refresh, or join the one already in progress."""
+    await asyncio.shield(_start_refresh())
+
+
+async def _ensure_built() -> None:
+    """
+    Build the feed on first use; once it is older than the refresh
+    interval, serve it as is and rebuild in the background (this keeps
+    the feed fresh even when the refresh loop isn't running).
+    """
+    if _feed is None:
+        await _shared_refresh()
+    elif time.monotonic() - _built_at > settings.home_feed_refresh_interval:
+        _start_refresh()
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await _shared_refresh()
+        except Exception as e:
+            logger.error(f"Home feed refresh failed: {e}")
+        await asyncio.sleep(settings.home_feed_refresh_interval)
+
+
+def start() -> None:
+    """Start periodic background refreshes (call from app startup)."""
+    global _refresher
+    if _refresher is None or _refresher.done():
+        _refresher = background_service.spawn(_refresh_loop(), name="home-feed-refresh")
+
+
+def stop() -> None:
+    if _refresher is not None:
+        _refresher.cancel()
+
+
+async def get_feed_json() -> bytes:
+    """Pre-encoded anonymous feed."""
+    await _ensure_built()
+    return _feed_json
+
+
+async def get_personalized_feed(uid: str, for_you: bool = False) -> dict:
+    """
+    Layer a user's preferences on the shared feed.
+
+    Their preferred language shelf moves to the top and skipped songs are
+    dropped, using only the cached preferences and skip index. With
+    `for_you`, a recommendations shelf is computed and prepended.
+    """
+    await _ensure_built()
+    prefs = firebase_service.get_preferences(uid) or {}
+    preferred = (prefs.get("language") or "").lower()
+
+    shelves = []
+    for shelf in _feed["data"]["shelves"]:
+        songs = skip_service.filter_skipped(uid, shelf["songs"])
+        shelves.append({**shelf, "songs": songs})
+    if preferred:
+        shelves.sort(key=lambda s: s.get("language") != preferred)
+
+    if for_you:
+        from app.services import recommendation_service
+
+        recs = await recommendation_service.get_recommendations(uid=uid, limit=settings.home_feed_shelf_size)
+        if recs.get("data"):
+            shelves.insert(0, {"id": "for-you", "title": "For You", "songs": recs["data"]})
+
+    return {"success": True, "data": {**_feed["data"], "shelves": shelves}}
+
+
+def trending_songs() -> List[Dict]:
+    """Songs on the prebuilt trending shelf (empty until the first build)."""
+    if not _feed:
+        return []
+    for shelf in _feed["data"]["shelves"]:
+        if shelf["id"] == "trending":
+            return shelf["songs"]
+    return []
@@ -0,0 +1,123 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Optional
+from app.config import settings
+from app.services import background_service
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop scheduling delay and captures what blocks it.
+
+    A coroutine sleeps for `interval` and records how late it wakes up. A
+    watchdog thread notices when that coroutine hasn't woken for
+    `interval + threshold` and logs the loop thread's current stack — the
+    blocking callback — at most once per `log_interval` seconds.
+    """
+
+    def __init__(self, interval: float, threshold: float, log_interval: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+        self._lags = deque(maxlen=max(1, int(60 / interval)))  # ~last minute
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_log = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.suppressed = 0
+
+    async def _sample(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self.interval)
+            self._heartbeat = now
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self) -> None:
+        stalled = False
+        while not self._stop.wait(self.threshold / 2):
+            overdue = time.monotonic() - self._heartbeat - self.interval
+            if overdue < self.threshold:
+                stalled = False
+                continue
+            if stalled:
+                continue  # one capture per stall
+            stalled = True
+            self.stalls += 1
+            now = time.monotonic()
+            if now - self._last_log < self.log_interval:
+                self.suppressed += 1
+                continue
+            self._last_log = now
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+            logger.warning(
+                f"🐢 Event loop blocked for {overdue * 1000:.0f} ms+ "
+                f"({self.suppressed} earlier stalls not logged). Blocking stack:\n{stack}"
+            )
+            self.suppressed = 0
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = background_service.spawn(self._sample(), name="loop-lag-sampler")
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    def stats(self) -> dict:
+        lags = sorted(self._lags)
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+        return {
+            "lastMs": round(self._lags[-1] * 1000, 2) if self._lags else 0.0,
+            "p99Ms": round(p99 * 1000, 2),
+            "maxMs": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls,
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def start() -> None:
+    """Start monitoring the running loop (call from app startup)."""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor(
+            interval=settings.loop_monitor_interval,
+            threshold=settings.loop_monitor_threshold,
+            log_interval=settings.loop_monitor_log_interval,
+        )
+        _monitor.start()
+        logger.info("🐢 Event-loop lag monitor started")
+
+
+def stop() -> None:
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
+
+
+def stats() -> Optional[dict]:
+    """Lag metrics, or None when the monitor isn't running in this worker."""
+    return _monitor.stats() if _monitor else None
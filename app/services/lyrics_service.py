@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Optional, List, Dict
+from app.config import settings
+from app.middleware import deadline
+from app.services import saavn_service, background_service
+from app.services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# song_id -> lyrics response, or None for songs known to have no lyrics
+_cache = TTLCache(maxsize=settings.lyrics_cache_size, ttl=settings.lyrics_cache_ttl)
+_inflight: Dict[str, asyncio.Future] = {}
+_MISSING = object()
+
+
+async def _fetch(song_id: str) -> Optional[dict]:
+    result = await saavn_service.get_song_lyrics(song_id)
+    if result is None:
+        # No answer (timeout, 5xx, deadline): not evidence the song has no
+        # lyrics, so don't cache; saavn_service's negative cache damps retries
+        return None
+    if result.get("success") and result.get("data"):
+        _cache.set(song_id, result)
+        return result
+    # Upstream answered without lyrics: remember it, but not for as long
+    _cache.set(song_id, None, ttl=settings.lyrics_negative_ttl)
+    return None
+
+
+async def get_lyrics(song_id: str) -> Optional[dict]:
+    """
+    Get lyrics for a song, from cache when possible.
+
+    The upstream call is shared with any prefetch or request already
+    waiting on it and is bound by none of their deadlines; a caller whose
+    own deadline runs out gets None (and a partial response) while the
+    fetch completes for the cache.
+    """
+    cached = _cache.get(song_id, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    # Share a single upstream call with any prefetch already running
+    future = _inflight.get(song_id)
+    if future is None:
+        future = asyncio.get_running_loop().create_task(_fetch(song_id), context=deadline.detached_context())
+        _inflight[song_id] = future
+        future.add_done_callback(lambda _: _inflight.pop(song_id, None))
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), deadline.remaining())
+    except asyncio.TimeoutError:
+        deadline.mark_partial()
+        return None
+
+
+def _has_lyrics(song: dict) -> Optional[bool]:
+    flag = song.get("hasLyrics", song.get("has_lyrics"))
+    if isinstance(flag, str):
+        return flag.lower() == "true"
+    return flag
+
+
+def prefetch_lyrics(songs: List[Dict], count: Optional[int] = None) -> None:
+    """
+    Warm the lyrics cache for the first `count` songs in the background.
+
+    Songs flagged as having no lyrics are skipped; songs without a flag are
+    fetched (a miss is cached as a negative result).
+    """
+    count = settings.lyrics_prefetch_count if count is None else count
+    for song in songs[:count]:
+        song_id = song.get("id") or song.get("song_id")
+        if not song_id or _has_lyrics(song) is False:
+            continue
+        if song_id in _cache or song_id in _inflight:
+            continue
+        background_service.spawn(get_lyrics(song_id), name=f"lyrics-prefetch-{song_id}", speculative=True)
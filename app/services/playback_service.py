@@ -0,0 +1,114 @@
+import asyncio
+import time
+import logging
+from typing import Optional, Dict, Set
+from fastapi import WebSocket
+from app.config import settings
+from app.services import firebase_service, skip_service, lyrics_service, background_service
+
+logger = logging.getLogger(__name__)
+
+# uid -> open playback sockets on this worker
+_connections: Dict[str, Set[WebSocket]] = {}
+# uid -> {"current": dict, "written_at": float, "dirty": bool}
+_state: Dict[str, dict] = {}
+
+
+def register(uid: str, websocket: WebSocket) -> None:
+    _connections.setdefault(uid, set()).add(websocket)
+
+
+async def unregister(uid: str, websocket: WebSocket) -> None:
+    """Drop a socket; when a user's last one closes, persist any unsaved position."""
+    sockets = _connections.get(uid)
+    if sockets is not None:
+        sockets.discard(websocket)
+        if sockets:
+            return
+        del _connections[uid]
+    state = _state.pop(uid, None)
+    if state and state["dirty"]:
+        await asyncio.to_thread(firebase_service.save_current_playing, uid, state["current"])
+
+
+def connection_count() -> int:
+    return sum(len(sockets) for sockets in _connections.values())
+
+
+async def broadcast(uid: str, message: dict, exclude: Optional[WebSocket] = None) -> None:
+    """Send a message to the user's other sockets, dropping any that have gone away."""
+    for websocket in list(_connections.get(uid, ())):
+        if websocket is exclude:
+            continue
+        try:
+            await websocket.send_json(message)
+        except Exception as e:
+            logger.debug(f"Dropping playback socket for {uid}: {e}")
+            _connections.get(uid, set()).discard(websocket)
+
+
+def publish_current(uid: str, current: dict) -> None:
+    """
+    Record a current-playing change saved outside the sockets (HTTP, batch
+    replay): refresh the in-memory state and push it to connected devices.
+    """
+    if uid not in _connections:
+        return
+    _state[uid] = {"current": current, "written_at": time.monotonic(), "dirty": False}
+    background_service.spawn(
+        broadcast(uid, {"type": "current", "data": current}),
+        name=f"playback-broadcast-{uid}",
+    )
+
+
+async def get_current(uid: str) -> Optional[dict]:
+    """Current playing state, from memory while the user is connected."""
+    state = _state.get(uid)
+    if state:
+        return state["current"]
+    return await asyncio.to_thread(firebase_service.get_current_playing, uid)
+
+
+async def play(uid: str, current: dict, history: dict, source: WebSocket) -> bool:
+    """A new song started: store it as current and in history, then tell other devices."""
+    now = time.monotonic()
+    saved, _ = await asyncio.gather(
+        asyncio.to_thread(firebase_service.save_current_playing, uid, current),
+        asyncio.to_thread(firebase_service.save_history, uid, current["song_id"], history),
+    )
+    _state[uid] = {"current": current, "written_at": now, "dirty": not saved}
+    lyrics_service.prefetch_lyrics([current], count=1)
+    await broadcast(uid, {"type": "current", "data": current}, exclude=source)
+    return saved
+
+
+async def position(uid: str, value: int, source: WebSocket) -> bool:
+    """
+    Playback position moved. Positions arrive every few seconds, so they
+    are kept in memory and only persisted/pushed once per write interval.
+    """
+    state = _state.get(uid)
+    if state is None:
+        current = await asyncio.to_thread(firebase_service.get_current_playing, uid)
+        if not current:
+            return False
+        state = _state[uid] = {"current": current, "written_at": 0.0, "dirty": False}
+
+    state["current"] = {**state["current"], "position": value}
+    state["dirty"] = True
+    now = time.monotonic()
+    if now - state["written_at"] < settings.playback_position_write_interval:
+        return True
+
+    state["written_at"] = now
+    saved = await asyncio.to_thread(firebase_service.save_current_playing, uid, state["current"])
+    state["dirty"] = not saved
+    await broadcast(uid, {"type": "current", "data": state["current"]}, exclude=source)
+    return saved
+
+
+async def skip(uid: str, song_id: str, data: dict) -> bool:
+    saved = await asyncio.to_thread(firebase_service.save_skipped, uid, song_id, data)
+    if saved:
+        skip_service.record_skip(uid, song_id)
+    return saved
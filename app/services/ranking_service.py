@@ -0,0 +1,167 @@
+import math
+import logging
+from typing import TYPE_CHECKING, Optional, List, Dict, Iterable
+
+# numpy is imported on first use to keep it off the startup path
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Feature columns: artist affinity, language match, popularity, recency.
+# Skipped songs need no column: callers drop them from the pool first.
+FEATURE_WEIGHTS = (2.0, 1.5, 1.0, 0.5)
+
+
+def _primary_artists(song: dict) -> List[str]:
+    """Lower-cased primary artist names of an upstream song dict."""
+    artists = song.get("artists")
+    if isinstance(artists, dict):
+        names = [a.get("name", "") for a in artists.get("primary", []) if isinstance(a, dict)]
+    else:
+        # Older API responses only carry a comma separated string
+        names = (song.get("primaryArtists") or "").split(",")
+    return [n.strip().lower() for n in names if n and n.strip()]
+
+
+def _parse_year(song: dict) -> float:
+    year = song.get("year") or (song.get("releaseDate") or "")[:4]
+    try:
+        return float(year)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def build_artist_affinity(
+    history: Optional[dict] = None,
+    preferred_artists: Optional[Iterable[str]] = None,
+) -> Dict[str, float]:
+    """
+    Build artist -> affinity (0..1) from play history and preferred artists.
+
+    History entries carry an `artist` string (possibly comma separated);
+    each play counts once per credited artist. Explicitly preferred artists
+    get full affinity.
+    """
+    counts: Dict[str, float] = {}
+    for entry in (history or {}).values():
+        if not isinstance(entry, dict):
+            continue
+        for name in (entry.get("artist") or "").split(","):
+            name = name.strip().lower()
+            if name:
+                counts[name] = counts.get(name, 0.0) + 1.0
+
+    top = max(counts.values(), default=0.0)
+    affinity = {name: c / top for name, c in counts.items()} if top else {}
+
+    for name in preferred_artists or []:
+        if name:
+            affinity[name.strip().lower()] = 1.0
+
+    return affinity
+
+
+def _play_count(song: dict) -> float:
+    try:
+        return float(song.get("playCount") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def build_features(
+    candidates: List[Dict],
+    affinity: Dict[str, float],
+    preferred_language: Optional[str] = None,
+    artists: Optional[List[List[str]]] = None,
+) -> "np.ndarray":
+    """
+    Build the (n, 4) feature matrix for a candidate pool.
+
+    The per-song fields are pulled out in one pass; every column is then
+    computed with NumPy. `artists` (from `_primary_artists`, per candidate)
+    can be passed in when the caller already has it.
+    """
+    import numpy as np
+
+    n = len(candidates)
+    if artists is None:
+        artists = [_primary_artists(song) for song in candidates]
+    languages = np.array([(song.get("language") or "").lower() for song in candidates], dtype=object)
+    plays = np.array([_play_count(song) for song in candidates])
+    years = np.array([_parse_year(song) for song in candidates])
+
+    # Affinity: best-liked primary artist, over a flat (song, artist) list
+    aff = np.zeros(n)
+    if affinity:
+        owners = np.repeat(np.arange(n), [len(a) for a in artists])
+        scores = np.array([affinity.get(name, 0.0) for names in artists for name in names])
+        if scores.size:
+            np.maximum.at(aff, owners, scores)
+
+    # Language: 1 match, 0 mismatch, 0.5 when either side is unknown
+    lang_match = np.full(n, 0.5)
+    if preferred_language:
+        known = languages != ""
+        lang_match[known] = languages[known] == preferred_language.lower()
+
+    # Popularity: log-scaled play count relative to the pool
+    popularity = np.log1p(plays)
+    top = popularity.max() if n else 0.0
+    if top > 0:
+        popularity /= top
+
+    # Recency: release year scaled to the pool's range, unknown -> midpoint
+    known = ~np.isnan(years)
+    recency = np.full(n, 0.5)
+    if known.any():
+        lo, hi = years[known].min(), years[known].max()
+        recency[known] = (years[known] - lo) / (hi - lo) if hi > lo else 1.0
+
+    return np.column_stack((aff, lang_match, popularity, recency))
+
+
+def rank_candidates(
+    candidates: List[Dict],
+    limit: int,
+    history: Optional[dict] = None,
+    preferences: Optional[dict] = None,
+    max_per_artist: int = 3,
+) -> List[Dict]:
+    """
+    Rank a candidate pool and return the top `limit` songs.
+
+    Scores are a weighted sum over the feature matrix. Selection walks the
+    ranking while capping songs per primary artist; capped songs are only
+    used to backfill when the pool is otherwise too small.
+    """
+    if not candidates:
+        return []
+
+    import numpy as np
+
+    preferences = preferences or {}
+    affinity = build_artist_affinity(history, preferences.get("artists"))
+    artists = [_primary_artists(song) for song in candidates]
+    features = build_features(candidates, affinity, preferences.get("language"), artists)
+    scores = features @ np.asarray(FEATURE_WEIGHTS)
+    order = np.argsort(-scores, kind="stable")
+
+    selected: List[Dict] = []
+    overflow: List[Dict] = []
+    per_artist: Dict[str, int] = {}
+
+    for idx in order.tolist():
+        song = candidates[idx]
+        key = artists[idx][0] if artists[idx] else None
+        if key and per_artist.get(key, 0) >= max_per_artist:
+            overflow.append(song)
+            continue
+        if key:
+            per_artist[key] = per_artist.get(key, 0) + 1
+        selected.append(song)
+        if len(selected) >= limit:
+            return selected
+
+    selected.extend(overflow[: limit - len(selected)])
+    return selected
@@ -1,92 +1,180 @@
+import asyncio
 import logging
-from typing import Optional
-from app.services import saavn_service, firebase_service
+from typing import Optional, List, Dict
+from app.services import saavn_service, firebase_service, ranking_service, skip_service, home_service, stats_service
 
 logger = logging.getLogger(__name__)
 
+# Largest page the upstream search reliably returns
+MAX_FETCH = 50
+
+
+def _extract_songs(response: Optional[dict], cap: int) -> List[Dict]:
+    """Pull the song list out of a suggestions/search response."""
+    if not response or not response.get("success"):
+        return []
+    data = response.get("data", [])
+    if isinstance(data, list):
+        return data[:cap]
+    if isinstance(data, dict):
+        return data.get("results", data.get("songs", []))[:cap]
+    return []
+
+
+async def _gather_songs(*coros, cap: int) -> List[Dict]:
+    """Run upstream calls concurrently and concatenate their songs in order."""
+    responses = await asyncio.gather(*coros, return_exceptions=True)
+    songs = []
+    for response in responses:
+        if isinstance(response, Exception):
+            logger.warning(f"Recommendation fetch failed: {response}")
+            continue
+        songs.extend(_extract_songs(response, cap))
+    return songs
+
+
+# ── Strategies ──────────────────────────────────────────────────────────────
+
+async def _history_suggestions(sorted_history: list) -> List[Dict]:
+    return await _gather_songs(
+        *(saavn_service.get_song_suggestions(sid) for sid, _ in sorted_history[:2]),
+        cap=5,
+    )
+
+
+async def _song_suggestions(song_id: str, limit: int) -> List[Dict]:
+    return await _gather_songs(saavn_service.get_song_suggestions(song_id), cap=limit)
+
+
+def _seed_artists(prefs: Optional[dict], stats: Optional[dict], count: int = 3) -> List[str]:
+    """Most played artists from the user's stats, then explicitly preferred ones."""
+    names = [row["name"] for row in stats_service.top(stats, "artists", count)]
+    names.extend((prefs or {}).get("artists") or [])
+    seeds, seen = [], set()
+    for name in names:
+        key = name.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            seeds.append(name)
+    return seeds[:count]
+
+
+def _seed_language(prefs: Optional[dict], stats: Optional[dict]) -> Optional[str]:
+    """Preferred language, else the most played one."""
+    if prefs and prefs.get("language"):
+        return prefs["language"]
+    top = stats_service.top(stats, "languages", 1)
+    return top[0]["name"] if top else None
+
+
+async def _preference_songs(artists: List[str], language: Optional[str], limit: int) -> List[Dict]:
+    # Search by seed artists, filtered by language if set
+    songs = await _gather_songs(
+        *(saavn_service.search_songs(name, limit=5) for name in artists),
+        cap=5,
+    )
+    if language:
+        lang = language.lower()
+        songs = [s for s in songs if not s.get("language") or s["language"].lower() == lang]
+
+    # Search by language to fill out the pool
+    if language and len(songs) < limit:
+        songs.extend(await _gather_songs(
+            saavn_service.search_songs(language, limit=limit), cap=limit
+        ))
+    return songs
+
+
+async def _trending_songs(limit: int) -> List[Dict]:
+    # Prefer the home feed's prebuilt (already enriched) trending shelf
+    prebuilt = home_service.trending_songs()
+    if len(prebuilt) >= limit:
+        return prebuilt[:limit]
+    return await _gather_songs(saavn_service.search_songs("trending", limit=limit), cap=limit)
+
+
+# ── Assembly ────────────────────────────────────────────────────────────────
 
 async def get_recommendations(
     song_id: Optional[str] = None,
     uid: Optional[str] = None,
     limit: int = 20,
 ) -> dict:
-    results = []
+    history = None
+    prefs = None
+    stats = None
+    skipped = set()
 
-    # ── Strategy 1: Recent History suggestions ──────────────────────────
-    if uid:
-        history = firebase_service.get_history(uid, limit=5)
-        if history:
-            # history is a dict of song_id: data. Sort by playedAt desc
-            sorted_history = sorted(
-                history.items(), 
-                key=lambda x: x[1].get("playedAt", 0), 
-                reverse=True
-            )
-            for song_id, data in sorted_history[:2]:
-                suggestions = await saavn_service.get_song_suggestions(song_id)
-                if suggestions and suggestions.get("success"):
-                    data = suggestions.get("data", [])
-                    if isinstance(data, list):
-                        results.extend(data[:5])
-                    elif isinstance(data, dict):
-                        results.extend(data.get("results", data.get("songs", []))[:5])
-
-    # ── Strategy 2: Song-based suggestions (if specific song_id given) ───
-    if song_id:
-        suggestions = await saavn_service.get_song_suggestions(song_id)
-        if suggestions and suggestions.get("success"):
-            data = suggestions.get("data", [])
-            if isinstance(data, list):
-                results.extend(data[:limit])
-            elif isinstance(data, dict):
-                results.extend(data.get("results", data.get("songs", []))[:limit])
-
-        if len(results) >= limit:
-            return {"success": True, "data": results[:limit], "source": "song_suggestions"}
-
-    # ── Strategy 3: User preference-based ───────────────────────────────
     if uid:
+        # Read once: used for seeding, exclusion and ranking
+        history = firebase_service.get_history(uid)
         prefs = firebase_service.get_preferences(uid)
-        if prefs:
-            preferred_language = prefs.get("language")
-            preferred_artists = prefs.get("artists", [])
-
-            # Search by preferred artists
-            for artist_name in preferred_artists[:3]:
-                artist_songs = await saavn_service.search_songs(artist_name, limit=5)
-                if artist_songs and artist_songs.get("success"):
-                    for song in artist_songs.get("data", {}).get("results", []):
-                        # Filter by language if set
-                        if preferred_language:
-                            song_lang = song.get("language", "").lower()
-                            if song_lang and song_lang != preferred_language.lower():
-                                continue
-                        results.append(song)
-
-            if results and len(results) >= limit:
-                return {"success": True, "data": results[:limit], "source": "preferences"}
-
-            # Search by language if we still need more
-            if preferred_language and len(results) < limit:
-                lang_songs = await saavn_service.search_songs(
-                    preferred_language, limit=limit - len(results)
-                )
-                if lang_songs and lang_songs.get("success"):
-                    results.extend(lang_songs.get("data", {}).get("results", []))
-
-            if results:
-                return {"success": True, "data": results[:limit], "source": "preferences"}
-
-    # ── Strategy 4: Trending fallback ───────────────────────────────────
-    trending = await saavn_service.search_songs("trending", limit=limit)
-    if trending and trending.get("success"):
-        results = trending.get("data", {}).get("results", [])
+        stats = firebase_service.get_stats(uid)
+        skipped = skip_service.get_skipped_ids(uid)
+
+    # history is a dict of song_id: data. Sort by playedAt desc
+    sorted_history = sorted(
+        (history or {}).items(),
+        key=lambda x: x[1].get("playedAt", 0) if isinstance(x[1], dict) else 0,
+        reverse=True,
+    )
+
+    # Never recommend the seed, something just played, or something skipped
+    exclude = set(skipped)
+    exclude.update(sid for sid, _ in sorted_history)
+    if song_id:
+        exclude.add(song_id)
+
+    # Over-fetch so the pool still reaches `limit` after exclusions
+    fetch = min(limit + len(exclude), MAX_FETCH)
+
+    # Strategies in priority order; each stage runs only while the pool is
+    # short. Stage 1 combines history and seed-song suggestions.
+    stages = []
+    primary = []
+    if sorted_history:
+        primary.append(("history", lambda: _history_suggestions(sorted_history)))
+    if song_id:
+        primary.append(("song_suggestions", lambda: _song_suggestions(song_id, fetch)))
+    if primary:
+        stages.append(primary)
+    seed_artists = _seed_artists(prefs, stats)
+    seed_language = _seed_language(prefs, stats)
+    if seed_artists or seed_language:
+        stages.append([("preferences", lambda: _preference_songs(seed_artists, seed_language, fetch))])
+    stages.append([("trending", lambda: _trending_songs(fetch))])
+
+    pool: Dict[str, Dict] = {}
+    sources = []
+
+    for stage in stages:
+        if len(pool) >= limit:
+            break
+        stage_results = await asyncio.gather(*(fetch() for _, fetch in stage))
+        for (name, _), songs in zip(stage, stage_results):
+            added = 0
+            for song in songs:
+                sid = song.get("id")
+                if not sid or sid in exclude or sid in pool:
+                    continue
+                pool[sid] = song
+                added += 1
+            if added:
+                sources.append(name)
+
+    # Rank with the same seeds: stats fill in when preferences are unset
+    ranking_prefs = dict(prefs or {})
+    ranking_prefs["language"] = seed_language
+    ranking_prefs["artists"] = list(ranking_prefs.get("artists") or []) + seed_artists
+    ranked = ranking_service.rank_candidates(
+        list(pool.values()), limit, history=history, preferences=ranking_prefs
+    )
 
     # ── Final Enrichment ────────────────────────────────────────────────
-    enriched_data = await saavn_service.enrich_songs(results[:limit])
+    enriched_data = await saavn_service.enrich_songs(ranked)
 
     return {
         "success": bool(enriched_data),
         "data": enriched_data,
-        "source": "mixed" if uid else "trending",
+        "source": sources[0] if len(sources) == 1 else ("mixed" if sources else "trending"),
     }
@@ -1,32 +1,92 @@
 import httpx
 import logging
 import asyncio
-from typing import Optional, List, Dict
+import base64
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Tuple
 from app.config import settings
+from app.middleware import admission, deadline, tracing
+from app.services.cache_service import TTLCache
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = settings.saavn_api_base_url
 
+# Short-lived memory of upstream calls that failed and song IDs that don't
+# resolve, consulted before calling upstream. Separate (shorter) TTL from
+# the positive caches.
+_negative = TTLCache(maxsize=settings.negative_cache_size, ttl=settings.negative_cache_ttl)
+_negative_counters = {"suppressed": 0, "stored": 0}
+# song_id -> shared lookup future while inside `shared_song_lookups`
+_song_lookups: ContextVar[Optional[Dict[str, asyncio.Future]]] = ContextVar("song_lookups", default=None)
+
+
+def _remember_failure(key: tuple) -> None:
+    _negative.set(key, True)
+    _negative_counters["stored"] += 1
+
+
+def _known_failure(key: tuple) -> bool:
+    if key in _negative:
+        _negative_counters["suppressed"] += 1
+        return True
+    return False
+
+
+def negative_cache_stats() -> dict:
+    """Counters for the negative cache (suppressed = upstream calls avoided)."""
+    return {**_negative_counters, "size": len(_negative)}
+
+
+def _span_name(endpoint: str) -> str:
+    """'/api/search/songs' -> 'saavn.search.songs'; stops at IDs in the path."""
+    parts = []
+    for part in endpoint.strip("/").split("/")[1:]:
+        if not part.isalpha():
+            break
+        parts.append(part)
+    return "saavn." + ".".join(parts or ["api"])
+
 
 async def _get(endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
-    """Make an async GET request to the Saavn API."""
+    """
+    Make an async GET request to the Saavn API.
+
+    The timeout is capped by the current request's deadline; once that has
+    passed the call is skipped and the request is marked partial.
+    """
     url = f"{BASE_URL}{endpoint}"
+    failure_key = ("get", endpoint, tuple(sorted((params or {}).items())))
+    if _known_failure(failure_key):
+        return None
+    if deadline.expired():
+        logger.warning(f"Deadline passed, skipping Saavn call: {url}")
+        return None
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url, params=params)
+        async with httpx.AsyncClient(timeout=deadline.upstream_timeout(settings.upstream_timeout)) as client:
+            with tracing.span(_span_name(endpoint)), admission.upstream_call():
+                response = await client.get(url, params=params)
             if response.status_code != 200:
                 logger.error(f"Upstream error from Saavn API: {response.status_code} for {url}. Result: {response.text[:200]}")
             response.raise_for_status()
             return response.json()
     except httpx.TimeoutException:
-        logger.error(f"Timeout calling Saavn API: {url}")
+        if deadline.expired():
+            # Our deadline, not the upstream's fault: don't remember it
+            logger.warning(f"Deadline reached calling Saavn API: {url}")
+        else:
+            logger.error(f"Timeout calling Saavn API: {url}")
+            _remember_failure(failure_key)
         return None
     except httpx.HTTPStatusError as e:
         # Already logged status code above
+        _remember_failure(failure_key)
         return None
     except Exception as e:
         logger.error(f"Saavn API error: {e}")
+        _remember_failure(failure_key)
         return None
 
 
@@ -38,9 +98,13 @@ async def global_search(query: str, language: Optional[str] = None, limit: int =
     if language:
         params["language"] = language
     
-    # Launch Global Search and dedicated Song Search in parallel
+    # Launch Global Search and dedicated Song Search in parallel.
+    # With a language filter, the song search pages until it has `limit` matches.
     global_task = _get("/api/search", params=params)
-    songs_task = search_songs(query, page=0, limit=limit)
+    if language:
+        songs_task = search_songs_filled(query, language, limit=limit)
+    else:
+        songs_task = search_songs(query, page=0, limit=limit)
     
     results = await asyncio.gather(global_task, songs_task, return_exceptions=True)
     
@@ -99,6 +163,9 @@ async def global_search(query: str, language: Optional[str] = None, limit: int =
                 ]
             # Verify enrichment for these songs
             data["songs"] = {"results": await enrich_songs(dedicated_songs)}
+            next_cursor = songs_result.get("data", {}).get("nextCursor")
+            if next_cursor:
+                data["songs"]["nextCursor"] = next_cursor
         
         # Fallback: if dedicated search failed or returned nothing, use global songs (enriched)
         elif "songs" in data and "results" in data["songs"]:
@@ -120,6 +187,122 @@ async def search_songs(query: str, page: int = 0, limit: int = 20) -> Optional[d
     })
 
 
+def encode_search_cursor(page: int, size: int, skip: int) -> str:
+    """Opaque continuation cursor: upstream page, page size, items consumed."""
+    return base64.urlsafe_b64encode(f"{page}:{size}:{skip}".encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[int, int, int]:
+    """Inverse of `encode_search_cursor`. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        page, size, skip = (int(x) for x in raw.split(":"))
+    except Exception:
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+    if page < 0 or size < 1 or skip < 0:
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+    return page, size, skip
+
+
+async def search_songs_filled(
+    query: str,
+    language: str,
+    limit: int = 20,
+    page: int = 0,
+    cursor: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Search songs in one language, paging upstream until `limit` match.
+
+    The first upstream page is fetched alone; if it doesn't fill the
+    request, further pages are fetched concurrently in batches until
+    `limit` matches are collected, results run out, or the page/time budget
+    is spent. `nextCursor` resumes exactly after the last returned song.
+    Raises ValueError for a malformed cursor.
+    """
+    size = limit
+    skip = 0
+    if cursor:
+        page, size, skip = decode_search_cursor(cursor)
+
+    lang = language.lower()
+    budget = deadline.upstream_timeout(settings.search_fill_time_budget)
+    fill_deadline = time.monotonic() + budget
+    matches: List[Dict] = []
+    total = None
+    next_position: Optional[Tuple[int, int]] = (page, skip)
+    fetched = 0
+
+    while next_position and len(matches) < limit and fetched < settings.search_fill_max_pages:
+        remaining = fill_deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        first = next_position[0]
+        batch = 1 if fetched == 0 else settings.search_fill_concurrency
+        batch = min(batch, settings.search_fill_max_pages - fetched)
+        tasks = [
+            asyncio.ensure_future(search_songs(query, page=p, limit=size))
+            for p in range(first, first + batch)
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=remaining)
+        for task in pending:
+            task.cancel()
+        if pending:
+            deadline.expired()
+        fetched += batch
+
+        # Consume pages strictly in order. next_position always points at
+        # the first unconsumed song, so a failed page is simply retried on
+        # the next request.
+        stop = False
+        for task in tasks:
+            result = task.result() if task in done and not task.exception() else None
+            if not result or not result.get("success"):
+                stop = True
+                break
+
+            current, start = next_position
+            data = result.get("data", {})
+            total = data.get("total", total)
+            results = data.get("results", [])
+
+            for idx in range(start, len(results)):
+                song = results[idx]
+                if (song.get("language") or "").lower() == lang:
+                    matches.append(song)
+                    if len(matches) >= limit:
+                        break
+            else:
+                idx = len(results)
+
+            if idx + 1 < len(results):
+                next_position = (current, idx + 1)
+            elif not results or (total is not None and (current + 1) * size >= total):
+                next_position = None
+            else:
+                next_position = (current + 1, 0)
+
+            if next_position is None or len(matches) >= limit:
+                stop = True
+                break
+        if stop:
+            break
+
+    if total is None and not matches:
+        return None
+
+    return {
+        "success": True,
+        "data": {
+            "total": total,
+            "start": page * size + skip,
+            "results": matches,
+            "nextCursor": encode_search_cursor(next_position[0], size, next_position[1]) if next_position else None,
+        },
+    }
+
+
 async def search_albums(query: str, page: int = 0, limit: int = 20) -> Optional[dict]:
     """Search specifically for albums."""
     return await _get("/api/search/albums", params={
@@ -146,12 +329,41 @@ async def search_podcasts(query: str, page: int = 0, limit: int = 20) -> Optiona
 
 # ── Song Details ────────────────────────────────────────────────────────────
 
-async def get_song_by_id(song_id: str) -> Optional[dict]:
-    """Get full song details by ID. Supports comma separated IDs."""
+@contextmanager
+def shared_song_lookups():
+    """
+    Share song lookups (and so enrichment) between everything run inside
+    the block, e.g. the sub-requests of one /batch call. Each song ID is
+    fetched at most once; callers must treat the results as read-only.
+    """
+    token = _song_lookups.set({})
+    try:
+        yield
+    finally:
+        _song_lookups.reset(token)
+
+
+async def _fetch_song(song_id: str) -> Optional[dict]:
+    if _known_failure(("song", song_id)):
+        return None
     data = await _get("/api/songs", params={"ids": song_id})
+    # A successful call with no song means the ID doesn't resolve
+    if data and data.get("success") and not data.get("data") and "," not in song_id:
+        _remember_failure(("song", song_id))
     return data
 
 
+async def get_song_by_id(song_id: str) -> Optional[dict]:
+    """Get full song details by ID. Supports comma separated IDs."""
+    lookups = _song_lookups.get()
+    if lookups is None:
+        return await _fetch_song(song_id)
+    future = lookups.get(song_id)
+    if future is None:
+        future = lookups[song_id] = asyncio.ensure_future(_fetch_song(song_id))
+    return await asyncio.shield(future)
+
+
 async def get_song_lyrics(song_id: str) -> Optional[dict]:
     """Get lyrics for a song."""
     return await _get("/api/songs/lyrics", params={"ids": song_id})
@@ -219,7 +431,8 @@ async def enrich_songs(songs: List[Dict]) -> List[Dict]:
         # BUT if it already has a raw 'url' that looks like a stream, we might skip
         if not download_url or not isinstance(download_url, list) or len(download_url) == 0:
             song_id = item.get("id")
-            if song_id:
+            # IDs that recently failed to resolve are left as they are
+            if song_id and not _known_failure(("song", song_id)):
                 tasks.append(get_song_by_id(song_id))
                 indices_to_enrich.append(i)
 
@@ -229,7 +442,8 @@ async def enrich_songs(songs: List[Dict]) -> List[Dict]:
     logger.info(f"Enriching {len(tasks)} songs... (Total items: {len(songs)})")
     
     # Fetch all details in parallel, return_exceptions=True to keep moving on individual failures
-    enriched_results = await asyncio.gather(*tasks, return_exceptions=True)
+    with tracing.span("enrich"):
+        enriched_results = await asyncio.gather(*tasks, return_exceptions=True)
 
     for i, result in enumerate(enriched_results):
         original_index = indices_to_enrich[i]
@@ -257,5 +471,7 @@ async def enrich_songs(songs: List[Dict]) -> List[Dict]:
         else:
             msg = result.get("message") if result else "No response"
             logger.warning(f"Enrichment failed for {item_name} ({item_id}). Status: {msg}")
+            if not deadline.is_partial():
+                _remember_failure(("song", item_id))
 
     return songs
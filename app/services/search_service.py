@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import re
+import unicodedata
+from typing import Optional, Dict, Tuple, List
+from app.config import settings
+from app.middleware import deadline, tracing
+from app.services import saavn_service, background_service
+from app.services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (query, language, type, page, limit, cursor) -> successful, complete response
+_cache = TTLCache(maxsize=settings.search_cache_size, ttl=settings.search_cache_ttl)
+_inflight: Dict[tuple, asyncio.Future] = {}
+# (query, language) -> decayed search count
+_popularity: Dict[Tuple[str, Optional[str]], float] = {}
+_prewarmer: Optional[asyncio.Task] = None
+
+# Popularity scores are multiplied by this after every prewarm pass, so
+# the top-K follows what people search now rather than all-time totals
+POPULARITY_DECAY = 0.8
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query: NFKC-folded, case-folded, with
+    whitespace collapsed. Accents are kept; they change upstream results.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query).casefold()).strip()
+
+
+def _normalize_language(language: Optional[str]) -> Optional[str]:
+    return language.strip().lower() or None if language else None
+
+
+async def _run(query: str, type: Optional[str], language: Optional[str],
+               page: int, limit: int, cursor: Optional[str]) -> Optional[dict]:
+    """Uncached search against Saavn (query and language already normalized)."""
+    if type == "songs":
+        if language:
+            result = await saavn_service.search_songs_filled(
+                query, language, limit=limit, page=page, cursor=cursor
+            )
+        else:
+            result = await saavn_service.search_songs(query, page=page, limit=limit)
+
+        if result and result.get("success"):
+            data = result.get("data", {})
+            # Enrich results with download URLs
+            data["results"] = await saavn_service.enrich_songs(data.get("results", []))
+        return result
+    if type == "albums":
+        return await saavn_service.search_albums(query, page=page, limit=limit)
+    if type == "artists":
+        return await saavn_service.search_artists(query, page=page, limit=limit)
+    return await saavn_service.global_search(query, language=language, limit=limit)
+
+
+async def _fetch(key: tuple) -> Optional[dict]:
+    """Run a search and cache it if it succeeded."""
+    result = await _run(*key)
+    if result and result.get("success"):
+        _cache.set(key, result)
+    return result
+
+
+async def search(
+    query: str,
+    type: Optional[str] = None,
+    language: Optional[str] = None,
+    page: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    refresh: bool = False,
+) -> Optional[dict]:
+    """
+    Search with a result cache keyed by the normalized query.
+
+    Concurrent identical searches share one upstream call. That call is
+    traced on the request that started it but bound by no request's
+    deadline; each caller waits only as long as its own deadline allows
+    and otherwise gets a failure marked partial, while the search
+    completes and is cached for the next caller. Returns a copy, so
+    callers may modify the result. Raises ValueError for a malformed cursor.
+    """
+    key = (normalize_query(query), type, _normalize_language(language), page, limit, cursor)
+    if not refresh:
+        cached = _cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().create_task(_fetch(key), context=deadline.detached_context())
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    try:
+        with tracing.span("search"):
+            result = await asyncio.wait_for(asyncio.shield(future), deadline.remaining())
+    except asyncio.TimeoutError:
+        deadline.mark_partial()
+        return {"success": False, "partial": True, "message": "Search is still running; retry shortly"}
+    return dict(result) if isinstance(result, dict) else result
+
+
+# ── Popularity & Prewarming ─────────────────────────────────────────────────
+
+def record_query(query: str, language: Optional[str] = None) -> None:
+    """Count a user search towards the prewarm set."""
+    normalized = normalize_query(query)
+    if not normalized:
+        return
+    key = (normalized, _normalize_language(language))
+    _popularity[key] = _popularity.get(key, 0.0) + 1.0
+
+    if len(_popularity) > settings.search_popularity_max_queries:
+        # Keep the more popular half
+        keep = sorted(_popularity.items(), key=lambda x: x[1], reverse=True)
+        _popularity.clear()
+        _popularity.update(keep[: settings.search_popularity_max_queries // 2])
+
+
+def top_queries(k: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+    k = settings.search_prewarm_top_k if k is None else k
+    ranked = sorted(_popularity.items(), key=lambda x: x[1], reverse=True)
+    return [key for key, _ in ranked[:k]]
+
+
+async def prewarm() -> int:
+    """Refresh the cached default search for the top-K queries. Returns how many succeeded."""
+    queries = top_queries()
+    semaphore = asyncio.Semaphore(settings.search_prewarm_concurrency)
+
+    async def _one(query: str, language: Optional[str]) -> bool:
+        async with semaphore:
+            result = await search(query, language=language, refresh=True)
+            return bool(result and result.get("success"))
+
+    results = await asyncio.gather(*(_one(q, lang) for q, lang in queries), return_exceptions=True)
+
+    for key in list(_popularity):
+        _popularity[key] *= POPULARITY_DECAY
+        if _popularity[key] < 0.1:
+            del _popularity[key]
+
+    warmed = sum(1 for r in results if r is True)
+    if queries:
+        logger.info(f"🔥 Prewarmed {warmed}/{len(queries)} popular searches")
+    return warmed
+
+
+async def _prewarm_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.search_prewarm_interval)
+        try:
+            await prewarm()
+        except Exception as e:
+            logger.error(f"Search prewarm failed: {e}")
+
+
+def start() -> None:
+    """Start periodic prewarming (call from app startup)."""
+    global _prewarmer
+    if _prewarmer is None or _prewarmer.done():
+        _prewarmer = background_service.spawn(_prewarm_loop(), name="search-prewarm")
+
+
+def stop() -> None:
+    if _prewarmer is not None:
+        _prewarmer.cancel()
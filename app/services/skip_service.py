@@ -0,0 +1,51 @@
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set
+from app.config import settings
+from app.services import firebase_service
+
+logger = logging.getLogger(__name__)
+
+# uid -> set of skipped song IDs, least recently used first
+_index: "OrderedDict[str, Set[str]]" = OrderedDict()
+
+
+def get_skipped_ids(uid: str) -> Set[str]:
+    """
+    Get the user's skipped song IDs.
+
+    Loaded lazily from RTDB on first use, then served from memory and kept
+    current by `record_skip`. Users with no skips are cached as an empty
+    set; only a failed load is left uncached so it is retried.
+    """
+    ids = _index.get(uid)
+    if ids is not None:
+        _index.move_to_end(uid)
+        return ids
+
+    data = firebase_service.get_skipped(uid)
+    if data is None:
+        return set()
+
+    ids = set(data.keys()) if isinstance(data, dict) else set()
+    _index[uid] = ids
+    while len(_index) > settings.skip_index_max_users:
+        _index.popitem(last=False)
+    return ids
+
+
+def record_skip(uid: str, song_id: str) -> None:
+    """Add a skip event to the in-memory index (if the user is loaded)."""
+    ids = _index.get(uid)
+    if ids is not None:
+        ids.add(song_id)
+
+
+def filter_skipped(uid: Optional[str], songs: List[Dict]) -> List[Dict]:
+    """Drop songs the user has skipped. Anonymous users are not filtered."""
+    if not uid or not songs:
+        return songs
+    ids = get_skipped_ids(uid)
+    if not ids:
+        return songs
+    return [s for s in songs if s.get("id") not in ids]
@@ -0,0 +1,106 @@
+import re
+from typing import Optional, List, Dict, Iterable
+
+# Per-user listening aggregates under users/{uid}/stats, small enough to
+# read whole on every recommendation:
+#   plays, lastPlayedAt
+#   artists/{key}:   {count, lastPlayedAt, name}
+#   languages/{key}: {count, lastPlayedAt}
+# Per-song counts grow with everything ever played, so they live apart in
+# users/{uid}/songStats/{song_id}: {count, lastPlayedAt}, indexed on count.
+# Keys are lower-cased names with RTDB-illegal characters replaced.
+
+# Set on history entries whose play is already in the stats, so compaction
+# only counts older (pre-stats) entries when it trims them
+COUNTED = "statsCounted"
+
+_INVALID_KEY = re.compile(r"[.$#\[\]/\x00-\x1f\x7f]")
+
+
+def _increment(n: int) -> dict:
+    return {".sv": {"increment": n}}
+
+
+def stat_key(name: str) -> str:
+    """RTDB-safe, case-insensitive key for an artist or language name."""
+    return _INVALID_KEY.sub("_", name.strip().lower())[:200]
+
+
+def _artists(entry: dict) -> List[str]:
+    return [a.strip() for a in (entry.get("artist") or "").split(",") if a.strip()]
+
+
+def play_updates(entries: Iterable[dict], backfill: bool = False) -> dict:
+    """
+    Multi-path update (relative to users/{uid}) recording a set of plays.
+
+    Plays are aggregated first so repeated artists or songs within one
+    update still count once per play. Each entry needs `song_id` and
+    `playedAt`; `artist` and `language` are optional. With `backfill`
+    (old plays counted late) only counts change, so lastPlayedAt values
+    never move backwards.
+    """
+    counts: Dict[str, int] = {}
+    latest: Dict[str, int] = {}
+    names: Dict[str, str] = {}
+    plays = 0
+    last = 0
+
+    def _add(path: str, played_at: int) -> None:
+        counts[path] = counts.get(path, 0) + 1
+        latest[path] = max(latest.get(path, 0), played_at)
+
+    for entry in entries:
+        played_at = int(entry.get("playedAt") or 0)
+        plays += 1
+        last = max(last, played_at)
+        if entry.get("song_id"):
+            _add(f"songStats/{entry['song_id']}", played_at)
+        for name in _artists(entry):
+            key = stat_key(name)
+            if key:
+                _add(f"stats/artists/{key}", played_at)
+                names[f"stats/artists/{key}"] = name
+        if entry.get("language"):
+            key = stat_key(entry["language"])
+            if key:
+                _add(f"stats/languages/{key}", played_at)
+
+    if not plays:
+        return {}
+
+    updates = {"stats/plays": _increment(plays)}
+    if not backfill:
+        updates["stats/lastPlayedAt"] = last
+    for path, count in counts.items():
+        updates[f"{path}/count"] = _increment(count)
+        if not backfill:
+            updates[f"{path}/lastPlayedAt"] = latest[path]
+    for path, name in names.items():
+        updates[f"{path}/name"] = name
+    return updates
+
+
+def top(stats: Optional[dict], kind: str, limit: int = 10) -> List[dict]:
+    """Most played `kind` (artists, languages or songs), ties broken by recency."""
+    entries = (stats or {}).get(kind) or {}
+    rows = [
+        {"key": key, "name": value.get("name", key), "count": value.get("count", 0),
+         "lastPlayedAt": value.get("lastPlayedAt")}
+        for key, value in entries.items()
+        if isinstance(value, dict)
+    ]
+    rows.sort(key=lambda r: (r["count"], r["lastPlayedAt"] or 0), reverse=True)
+    return rows[:limit]
+
+
+def summarize(stats: Optional[dict], limit: int = 10, songs: Optional[dict] = None) -> dict:
+    """API shape of a user's stats; `songs` is the top of songStats."""
+    stats = stats or {}
+    return {
+        "plays": stats.get("plays", 0),
+        "lastPlayedAt": stats.get("lastPlayedAt"),
+        "topArtists": top(stats, "artists", limit),
+        "topLanguages": top(stats, "languages", limit),
+        "topSongs": top({"songs": songs}, "songs", limit),
+    }
@@ -0,0 +1,292 @@
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple, AsyncIterator
+import httpx
+from app.config import settings
+from app.middleware import deadline
+from app.services import saavn_service
+from app.services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class StreamError(Exception):
+    """Audio could not be resolved or fetched from the origin."""
+
+
+class SegmentCache:
+    """
+    Size-bounded LRU of fixed-size audio segments stored on disk.
+
+    The index lives in memory and is rebuilt from the directory (oldest
+    modification first) at startup. Files are written to a unique temp
+    file and renamed so readers never see a partial segment, even when
+    two writers store the same segment at once.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.directory, name))
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    async def get(self, name: str) -> Optional[bytes]:
+        if name not in self._index:
+            return None
+        data = await asyncio.to_thread(self._read, name)
+        if data is None:
+            self._bytes -= self._index.pop(name, 0)
+            return None
+        self._index.move_to_end(name)
+        return data
+
+    async def put(self, name: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, name, data)
+        self._bytes += len(data) - self._index.pop(name, 0)
+        self._index[name] = len(data)
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+
+# song_id:quality -> source dict (url, size, content type). Kept well under the
+# lifetime of Saavn's signed links.
+_sources = TTLCache(maxsize=5000, ttl=settings.stream_source_ttl)
+_segments: Optional[SegmentCache] = None
+# segment name -> origin fetch shared by every listener waiting on it
+_inflight: Dict[str, asyncio.Future] = {}
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _segment_cache() -> SegmentCache:
+    global _segments
+    if _segments is None:
+        _segments = SegmentCache(settings.stream_cache_dir, settings.stream_cache_max_bytes)
+    return _segments
+
+
+def _http() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=settings.upstream_timeout, follow_redirects=True)
+    return _client
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def pick_download_url(download_urls: list, quality: Optional[str] = None) -> Optional[dict]:
+    """Pick the requested quality, else the best available (list is ascending)."""
+    entries = [d for d in download_urls or [] if isinstance(d, dict) and d.get("url")]
+    if not entries:
+        return None
+    quality = quality or settings.stream_default_quality
+    for entry in entries:
+        if entry.get("quality") == quality:
+            return entry
+    return entries[-1]
+
+
+async def _resolve_url(song_id: str, quality: Optional[str]) -> Tuple[str, str]:
+    """Return (chosen quality, CDN url) from the enriched song details."""
+    result = await saavn_service.get_song_by_id(song_id)
+    data = result.get("data") if result and result.get("success") else None
+    song = data[0] if isinstance(data, list) and data else data
+    if not isinstance(song, dict):
+        raise StreamError(f"Song {song_id} not found")
+    entry = pick_download_url(song.get("downloadUrl"), quality)
+    if not entry:
+        raise StreamError(f"No download URL for song {song_id}")
+    return entry.get("quality", "unknown"), entry["url"]
+
+
+async def _fetch_range(url: str, start: int, end: int) -> Tuple[bytes, Optional[int], Optional[str]]:
+    """Fetch bytes [start, end] from the origin. Returns (data, total size, content type)."""
+    async with _http().stream("GET", url, headers={"Range": f"bytes={start}-{end}"}) as response:
+        if response.status_code == 200:
+            # Origin ignored Range: read only what this segment needs
+            chunks, read = [], 0
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                read += len(chunk)
+                if read > end:
+                    break
+            data = b"".join(chunks)[start:end + 1]
+            total = response.headers.get("content-length")
+            return data, int(total) if total else None, response.headers.get("content-type")
+        if response.status_code != 206:
+            raise StreamError(f"Origin returned {response.status_code} for {url}")
+        data = await response.aread()
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return data, int(total) if total.isdigit() else None, response.headers.get("content-type")
+
+
+def _segment_name(key: str, index: int) -> str:
+    return f"{hashlib.sha1(key.encode()).hexdigest()}-{index}"
+
+
+async def _fetch_segment(name: str, url: str, index: int) -> Tuple[bytes, Optional[int], Optional[str]]:
+    size = settings.stream_segment_size
+    data, total, content_type = await _fetch_range(url, index * size, (index + 1) * size - 1)
+    try:
+        await _segment_cache().put(name, data)
+    except OSError as e:
+        # The listener still gets the bytes; only the cache misses out
+        logger.warning(f"Could not cache stream segment {name}: {e}")
+    return data, total, content_type
+
+
+async def _get_segment(key: str, url: str, index: int) -> Tuple[bytes, Optional[int], Optional[str]]:
+    """
+    One segment, from disk or the origin.
+
+    Listeners asking for the same uncached segment share one origin fetch,
+    which finishes (and is cached) even if the listener that started it
+    disconnects.
+    """
+    name = _segment_name(key, index)
+    data = await _segment_cache().get(name)
+    if data is not None:
+        return data, None, None
+
+    future = _inflight.get(name)
+    if future is None:
+        future = asyncio.get_running_loop().create_task(
+            _fetch_segment(name, url, index), context=deadline.detached_context()
+        )
+        _inflight[name] = future
+        future.add_done_callback(lambda _: _inflight.pop(name, None))
+    return await asyncio.shield(future)
+
+
+async def open_stream(song_id: str, quality: Optional[str] = None) -> dict:
+    """
+    Resolve a song's audio source: {"key", "url", "size", "content_type"}.
+
+    The size and content type come from the first segment, which is then
+    cached, so the common "play from the start" case costs one origin hit.
+    A link that has expired is re-resolved once.
+    """
+    source_key = f"{song_id}:{quality or settings.stream_default_quality}"
+    source = _sources.get(source_key)
+    if source:
+        return source
+
+    chosen, url = await _resolve_url(song_id, quality)
+    key = f"{song_id}:{chosen}"
+    # Bypass the segment cache here: we need the origin's headers
+    try:
+        data, total, content_type = await _fetch_range(url, 0, settings.stream_segment_size - 1)
+    except StreamError:
+        chosen, url = await _resolve_url(song_id, quality)
+        data, total, content_type = await _fetch_range(url, 0, settings.stream_segment_size - 1)
+    if total is None:
+        raise StreamError(f"Origin did not report a size for song {song_id}")
+
+    await _segment_cache().put(_segment_name(key, 0), data)
+    source = {
+        "key": key,
+        "source_key": source_key,
+        "url": url,
+        "size": total,
+        "content_type": content_type or "audio/mp4",
+    }
+    _sources.set(source_key, source)
+    return source
+
+
+async def iter_range(source: dict, start: int, end: int) -> AsyncIterator[bytes]:
+    """Yield bytes [start, end] of a source, one cached segment at a time."""
+    size = settings.stream_segment_size
+    for index in range(start // size, end // size + 1):
+        try:
+            data, _, _ = await _get_segment(source["key"], source["url"], index)
+        except StreamError as e:
+            # Mid-stream we can't change the status any more; end the body
+            _sources.pop(source["source_key"], None)
+            logger.warning(f"Stream segment fetch failed: {e}")
+            return
+        seg_start = index * size
+        lo = max(start - seg_start, 0)
+        hi = min(end - seg_start, len(data) - 1)
+        if lo <= hi:
+            yield data[lo:hi + 1]
+
+
+def parse_range(header: Optional[str], total: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range against `total`.
+
+    Returns None when there's no usable Range header (serve everything) and
+    raises ValueError when the range can't be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            start, end = total - int(last), total - 1
+            start = max(start, 0) if int(last) > 0 else total
+        else:
+            start = int(first)
+            end = int(last) if last else total - 1
+    except ValueError:
+        return None
+    if start >= total or end < start:
+        raise ValueError(header)
+    return start, min(end, total - 1)
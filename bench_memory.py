@@ -0,0 +1,113 @@
+"""
+Memory benchmark: bytes per cached song, raw upstream dicts vs CompactSong.
+
+    python bench_memory.py            # 20,000 songs
+    python bench_memory.py --songs 100000
+
+Songs are synthetic but shaped like Saavn API responses, and go through a
+JSON round trip so strings are distinct objects as they are in production.
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from app.models.song import CompactSong
+
+LANGUAGES = ["hindi", "english", "punjabi", "tamil", "telugu", "bengali"]
+ROLES = ["singer", "music", "lyricist", "starring"]
+IMAGE_SIZES = ["50x50", "150x150", "500x500"]
+BITRATES = ["12", "48", "96", "160", "320"]
+
+
+def _artist(i: int) -> dict:
+    return {
+        "id": str(450000 + i),
+        "name": f"Artist {i}",
+        "role": random.choice(ROLES),
+        "type": "artist",
+        "image": [
+            {"quality": q, "url": f"https://c.saavncdn.com/artists/Artist_{i}_{q}.jpg"}
+            for q in IMAGE_SIZES
+        ],
+        "url": f"https://www.jiosaavn.com/artist/artist-{i}/x{i}",
+    }
+
+
+def make_song(i: int, artists: list) -> dict:
+    primary = random.sample(artists, 2)
+    others = random.sample(artists, 2)
+    return {
+        "id": f"Song{i:08d}",
+        "name": f"Song number {i}",
+        "type": "song",
+        "year": str(random.randint(1990, 2025)),
+        "releaseDate": None,
+        "duration": random.randint(120, 400),
+        "label": f"Label {i % 50}",
+        "explicitContent": False,
+        "playCount": random.randint(0, 10**8),
+        "language": random.choice(LANGUAGES),
+        "hasLyrics": random.random() < 0.4,
+        "lyricsId": None,
+        "url": f"https://www.jiosaavn.com/song/song-{i}/abc{i}",
+        "copyright": f"(P) {random.randint(1990, 2025)} Label {i % 50}",
+        "album": {"id": str(1000000 + i // 10), "name": f"Album {i // 10}", "url": f"https://www.jiosaavn.com/album/a{i // 10}"},
+        "artists": {"primary": primary, "featured": [], "all": primary + others},
+        "image": [
+            {"quality": q, "url": f"https://c.saavncdn.com/{i % 1000}/Song-{i}-{q}.jpg"}
+            for q in IMAGE_SIZES
+        ],
+        "downloadUrl": [
+            {"quality": f"{b}kbps", "url": f"https://aac.saavncdn.com/{i % 1000}/{i:08x}_{b}.mp4"}
+            for b in BITRATES
+        ],
+    }
+
+
+def measure(build) -> tuple:
+    """Build an object and return it with the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, used
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    artists = [_artist(i) for i in range(2000)]
+    payload = json.dumps([make_song(i, artists) for i in range(args.songs)])
+
+    # Each side parses its own copy so compact songs don't borrow the raw
+    # dicts' strings; only what the cache would keep is still allocated.
+    raw, raw_bytes = measure(lambda: json.loads(payload))
+    del raw
+    compact, compact_bytes = measure(lambda: [CompactSong.from_api(s) for s in json.loads(payload)])
+
+    # Conversion speed, measured without tracemalloc overhead
+    raw = json.loads(payload)
+    t0 = time.perf_counter()
+    compact = [CompactSong.from_api(s) for s in raw]
+    build_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for song in compact:
+        song.to_api()
+    to_api_time = time.perf_counter() - t0
+
+    n = args.songs
+    print(f"📦 {n:,} songs")
+    print(f"   raw dicts:     {raw_bytes / n:8.0f} bytes/song  ({raw_bytes / 2**20:7.1f} MiB)")
+    print(f"   CompactSong:   {compact_bytes / n:8.0f} bytes/song  ({compact_bytes / 2**20:7.1f} MiB)")
+    print(f"   reduction:     {1 - compact_bytes / raw_bytes:8.1%}")
+    print(f"   from_api:      {build_time / n * 1e6:8.1f} µs/song")
+    print(f"   to_api:        {to_api_time / n * 1e6:8.1f} µs/song")
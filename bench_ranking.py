@@ -0,0 +1,57 @@
+"""
+Ranking benchmark: time to score and select a recommendation pool.
+
+    python bench_ranking.py                 # 300 candidates
+    python bench_ranking.py --candidates 1000 --runs 500
+
+The budget is under a millisecond for a few hundred candidates. Songs are
+the synthetic Saavn-shaped dicts from bench_memory.py.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.services import ranking_service
+from bench_memory import _artist, make_song
+
+BUDGET_MS = 1.0
+
+
+def _time(func, runs: int) -> list:
+    """Per-call milliseconds over `runs` calls, after one warm-up call."""
+    func()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return sorted(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    artists = [_artist(i) for i in range(500)]
+    candidates = json.loads(json.dumps([make_song(i, artists) for i in range(args.candidates)]))
+    history = {
+        f"Song{i:08d}": {"artist": f"Artist {random.randrange(100)}, Artist {random.randrange(500)}"}
+        for i in range(200)
+    }
+    preferences = {"language": "hindi", "artists": ["Artist 7", "Artist 42"]}
+
+    affinity = ranking_service.build_artist_affinity(history, preferences["artists"])
+    features = _time(lambda: ranking_service.build_features(candidates, affinity, "hindi"), args.runs)
+    ranking = _time(lambda: ranking_service.rank_candidates(candidates, 50, history, preferences), args.runs)
+
+    print(f"🏁 {args.candidates:,} candidates, {args.runs} runs")
+    for name, samples in (("build_features", features), ("rank_candidates", ranking)):
+        p90 = samples[int(len(samples) * 0.9)]
+        print(f"   {name + ':':17} median {statistics.median(samples):6.3f} ms   p90 {p90:6.3f} ms")
+    median = statistics.median(ranking)
+    print(f"   budget:           {BUDGET_MS:.1f} ms ({'ok' if median < BUDGET_MS else 'over'})")
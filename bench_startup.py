@@ -0,0 +1,99 @@
+"""
+Startup benchmark: import-time breakdown and time to first request.
+
+    python bench_startup.py            # fast-start mode vs normal mode
+    python bench_startup.py --top 25   # show more modules
+
+Each measurement runs in a fresh interpreter so nothing is pre-imported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+FIRST_REQUEST_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/health")
+t2 = time.perf_counter()
+print(f"{(t1 - t0) * 1000:.1f} {(t2 - t0) * 1000:.1f}")
+"""
+
+
+def _env(fast_start: bool) -> dict:
+    env = dict(os.environ)
+    env["FAST_START"] = "true" if fast_start else "false"
+    return env
+
+
+def import_breakdown(fast_start: bool) -> list:
+    """Return [(cumulative_us, self_us, module)] from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=_env(fast_start),
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+        except ValueError:
+            continue  # header line
+    return rows
+
+
+def package_totals(rows: list) -> list:
+    """Self import time summed per root package (fastapi, pydantic, app, ...)."""
+    totals = {}
+    for _, self_us, name in rows:
+        root = name.strip().split(".")[0]
+        totals[root] = totals.get(root, 0) + self_us
+    return sorted(totals.items(), key=lambda x: x[1], reverse=True)
+
+
+def first_request(fast_start: bool) -> tuple:
+    """(import ms, import + startup + first /health ms) in a fresh process."""
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SNIPPET],
+        capture_output=True, text=True, env=_env(fast_start),
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return (float("nan"), float("nan"))
+    imported, served = proc.stdout.strip().splitlines()[-1].split()
+    return float(imported), float(served)
+
+
+def report(fast_start: bool, top: int):
+    label = "fast start" if fast_start else "normal"
+    rows = import_breakdown(fast_start)
+    app_main = next((c for c, _, n in rows if n.strip() == "app.main"), 0)
+    imported, served = first_request(fast_start)
+
+    print(f"\n⏱️  {label}")
+    print(f"   import app.main:         {app_main / 1000:8.1f} ms (importtime)")
+    print(f"   import (wall):           {imported:8.1f} ms")
+    print(f"   first /health response:  {served:8.1f} ms")
+
+    print(f"\n   Top {top} packages by import time:")
+    for root, total in package_totals(rows)[:top]:
+        print(f"   {total / 1000:8.1f} ms  {root}")
+
+    print(f"\n   Top {top} modules by self time:")
+    for cumulative, self_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"   {self_us / 1000:8.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    report(fast_start=True, top=args.top)
+    report(fast_start=False, top=args.top)
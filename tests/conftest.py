@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Deterministic "audio": byte i is i % 251, so any slice is easy to check
+AUDIO = bytes(i % 251 for i in range(10_000))
+
+
+class _OriginHandler(BaseHTTPRequestHandler):
+    """Stand-in for the audio CDN: serves AUDIO, honouring Range unless told not to."""
+
+    honor_range = True
+    requests = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        type(self).requests.append(range_header)
+        if self.path.startswith("/expired"):
+            self.send_response(403)
+            self.end_headers()
+            return
+
+        if range_header and self.honor_range:
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start, end = int(first), min(int(last), len(AUDIO) - 1)
+            body = AUDIO[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(AUDIO)}")
+        else:
+            body = AUDIO
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/mp4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client read only the part it needed
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    """Local Range-capable origin. Yields (base_url, handler class)."""
+    handler = type("Handler", (_OriginHandler,), {"honor_range": True, "requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", handler
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import saavn_service
+from app.services.saavn_service import decode_search_cursor, encode_search_cursor, search_songs_filled
+
+# 95 upstream results; every third one is Hindi
+CATALOG = [
+    {"id": f"s{i}", "language": "hindi" if i % 3 == 0 else "english"}
+    for i in range(95)
+]
+HINDI = [s["id"] for s in CATALOG if s["language"] == "hindi"]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake paged song search over CATALOG; records requested pages."""
+    calls = []
+    failing = set()
+
+    async def search_songs(query, page=0, limit=20):
+        calls.append(page)
+        if page in failing:
+            return None
+        results = CATALOG[page * limit:(page + 1) * limit]
+        return {"success": True, "data": {"total": len(CATALOG), "start": page * limit, "results": results}}
+
+    monkeypatch.setattr(saavn_service, "search_songs", search_songs)
+    monkeypatch.setattr(settings, "search_fill_max_pages", 5)
+    monkeypatch.setattr(settings, "search_fill_concurrency", 3)
+    return calls, failing
+
+
+def _fill(limit, cursor=None, language="Hindi"):
+    return asyncio.run(search_songs_filled("q", language, limit=limit, cursor=cursor))
+
+
+def _ids(result):
+    return [s["id"] for s in result["data"]["results"]]
+
+
+def test_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(3, 20, 7)) == (3, 20, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!", encode_search_cursor(0, 20, 0)[:-2] + "xx", "MTox", "LTE6MjA6MA"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_search_cursor(cursor)
+
+
+def test_fills_page_from_later_upstream_pages(upstream):
+    calls, _ = upstream
+    result = _fill(10)
+    # Page 0 (size 10) holds 4 Hindi songs; more pages are fetched to fill it
+    assert _ids(result) == HINDI[:10]
+    assert calls[0] == 0 and len(calls) > 1
+    assert result["data"]["nextCursor"]
+
+
+def test_cursors_walk_every_match_once(upstream):
+    seen, cursor, pages = [], None, 0
+    while True:
+        result = _fill(7, cursor)
+        seen.extend(_ids(result))
+        cursor = result["data"]["nextCursor"]
+        pages += 1
+        if not cursor or pages > 20:
+            break
+    assert seen == HINDI
+    assert cursor is None
+
+
+def test_cursor_resumes_mid_page(upstream):
+    first = _fill(5)
+    page, size, skip = decode_search_cursor(first["data"]["nextCursor"])
+    # The 5th Hindi song is s12, the 3rd song of upstream page 1 (size 5)
+    assert (page, size, skip) == (2, 5, 3)
+    assert _ids(_fill(5, first["data"]["nextCursor"]))[0] == HINDI[5]
+
+
+def test_page_budget_stops_early(upstream, monkeypatch):
+    calls, _ = upstream
+    monkeypatch.setattr(settings, "search_fill_max_pages", 2)
+    result = _fill(20)
+    assert len(calls) == 2
+    assert _ids(result) == HINDI[:len(_ids(result))]
+    # Resumes where the budget ran out
+    assert _ids(_fill(20, result["data"]["nextCursor"]))[0] == HINDI[len(_ids(result))]
+
+
+def test_failed_page_is_retried_from_the_cursor(upstream):
+    calls, failing = upstream
+    failing.add(1)
+    result = _fill(10)
+    assert _ids(result) == HINDI[:4]  # only page 0 could be consumed
+    assert decode_search_cursor(result["data"]["nextCursor"]) == (1, 10, 0)
+
+    failing.clear()
+    assert _ids(_fill(10, result["data"]["nextCursor"])) == HINDI[4:14]
+
+
+def test_no_results_at_all(upstream):
+    _, failing = upstream
+    failing.add(0)
+    assert _fill(10) is None
+
+
+def test_language_without_matches_ends_without_cursor(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "search_fill_max_pages", 50)
+    result = _fill(10, language="Tamil")
+    assert _ids(result) == []
+    assert result["data"]["nextCursor"] is None
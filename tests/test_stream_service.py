@@ -0,0 +1,224 @@
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.services import saavn_service, stream_service
+from app.services.stream_service import SegmentCache, StreamError, parse_range
+from tests.conftest import AUDIO
+
+SEGMENT = 1024
+
+
+@pytest.fixture
+def stream(origin, tmp_path, monkeypatch):
+    """stream_service wired to the stand-in origin, with a fresh disk cache."""
+    base_url, handler = origin
+    monkeypatch.setattr(settings, "stream_segment_size", SEGMENT)
+    monkeypatch.setattr(stream_service, "_segments", SegmentCache(str(tmp_path), 10 * SEGMENT))
+    monkeypatch.setattr(stream_service, "_client", None)
+    stream_service._sources.clear()
+
+    async def get_song_by_id(song_id):
+        return {"success": True, "data": [{"id": song_id, "downloadUrl": [
+            {"quality": "160kbps", "url": f"{base_url}/low.mp4"},
+            {"quality": "320kbps", "url": f"{base_url}/audio.mp4"},
+        ]}]}
+
+    monkeypatch.setattr(saavn_service, "get_song_by_id", get_song_by_id)
+    yield handler
+    asyncio.run(stream_service.close())
+
+
+def _read(source, start, end):
+    async def collect():
+        try:
+            return b"".join([chunk async for chunk in stream_service.iter_range(source, start, end)])
+        finally:
+            await stream_service.close()
+    return asyncio.run(collect())
+
+
+def _open(song_id="s1", quality=None):
+    async def run():
+        try:
+            return await stream_service.open_stream(song_id, quality)
+        finally:
+            # Each asyncio.run gets its own loop; don't reuse the client across them
+            await stream_service.close()
+    return asyncio.run(run())
+
+
+# ── parse_range ─────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-5", None),
+    ("bytes=0-1,5-9", None),
+    ("bytes=a-b", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=-10", (990, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=999-999", (999, 999)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1500-1600", "bytes=50-10", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+# ── open_stream / iter_range ────────────────────────────────────────────────
+
+def test_open_stream_reads_size_and_caches_first_segment(stream):
+    handler = stream
+    source = _open()
+    assert source["size"] == len(AUDIO)
+    assert source["content_type"] == "audio/mp4"
+    assert source["url"].endswith("/audio.mp4")
+    assert handler.requests == [f"bytes=0-{SEGMENT - 1}"]
+
+    # Served from the source cache and the cached first segment
+    assert _open() is source
+    assert _read(source, 0, 99) == AUDIO[:100]
+    assert len(handler.requests) == 1
+
+
+def test_open_stream_picks_requested_quality(stream):
+    assert _open(quality="160kbps")["url"].endswith("/low.mp4")
+
+
+def test_open_stream_falls_back_to_best_quality(stream):
+    assert _open(quality="96kbps")["url"].endswith("/audio.mp4")
+
+
+@pytest.mark.parametrize("start, end", [
+    (0, len(AUDIO) - 1),              # whole file
+    (SEGMENT - 10, SEGMENT + 10),     # across one boundary
+    (SEGMENT, 2 * SEGMENT - 1),       # exactly one segment
+    (3 * SEGMENT + 5, 3 * SEGMENT + 5),  # single byte
+    (len(AUDIO) - 50, len(AUDIO) - 1),   # short last segment
+])
+def test_iter_range_slices_segments(stream, start, end):
+    source = _open()
+    assert _read(source, start, end) == AUDIO[start:end + 1]
+
+
+def test_iter_range_when_origin_ignores_range(stream):
+    handler = stream
+    handler.honor_range = False
+    source = _open()
+    assert source["size"] == len(AUDIO)
+    start, end = SEGMENT - 3, 3 * SEGMENT + 7
+    assert _read(source, start, end) == AUDIO[start:end + 1]
+
+
+def test_iter_range_segments_are_cached(stream):
+    handler = stream
+    source = _open()
+    _read(source, 0, 3 * SEGMENT - 1)
+    fetched = len(handler.requests)
+    assert _read(source, 0, 3 * SEGMENT - 1) == AUDIO[:3 * SEGMENT]
+    assert len(handler.requests) == fetched
+
+
+def test_concurrent_listeners_share_one_origin_fetch(stream):
+    handler = stream
+    source = _open()
+
+    async def listeners():
+        async def one():
+            return b"".join([chunk async for chunk in stream_service.iter_range(source, SEGMENT, 2 * SEGMENT - 1)])
+        try:
+            return await asyncio.gather(*(one() for _ in range(4)))
+        finally:
+            await stream_service.close()
+
+    assert asyncio.run(listeners()) == [AUDIO[SEGMENT:2 * SEGMENT]] * 4
+    assert handler.requests.count(f"bytes={SEGMENT}-{2 * SEGMENT - 1}") == 1
+    assert stream_service._inflight == {}
+
+
+def test_iter_range_stops_and_drops_source_on_origin_error(stream):
+    source = _open()
+    broken = {**source, "key": "other", "url": source["url"].replace("/audio.mp4", "/expired")}
+    assert _read(broken, 2 * SEGMENT, 3 * SEGMENT - 1) == b""
+    assert stream_service._sources.get(source["source_key"]) is None
+
+
+def test_open_stream_without_download_url(stream, monkeypatch):
+    async def get_song_by_id(song_id):
+        return {"success": True, "data": [{"id": song_id, "downloadUrl": []}]}
+
+    monkeypatch.setattr(saavn_service, "get_song_by_id", get_song_by_id)
+    with pytest.raises(StreamError):
+        _open("s2")
+
+
+# ── SegmentCache ────────────────────────────────────────────────────────────
+
+def test_segment_cache_evicts_least_recently_used(tmp_path):
+    async def run():
+        cache = SegmentCache(str(tmp_path), max_bytes=30)
+        await cache.put("a", b"a" * 10)
+        await cache.put("b", b"b" * 10)
+        await cache.put("c", b"c" * 10)
+        assert await cache.get("a") == b"a" * 10  # a is now most recent
+        await cache.put("d", b"d" * 10)
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.size == 30
+    assert sorted(os.listdir(tmp_path)) == ["a", "c", "d"]
+    assert asyncio.run(cache.get("b")) is None
+
+
+def test_segment_cache_replacing_an_entry_keeps_size_right(tmp_path):
+    async def run():
+        cache = SegmentCache(str(tmp_path), max_bytes=100)
+        await cache.put("a", b"x" * 40)
+        await cache.put("a", b"y" * 10)
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.size == 10
+    assert asyncio.run(cache.get("a")) == b"y" * 10
+
+
+def test_segment_cache_concurrent_writes_of_one_segment(tmp_path):
+    async def run():
+        cache = SegmentCache(str(tmp_path), max_bytes=1000)
+        for _ in range(50):
+            await asyncio.gather(*(cache.put("a", bytes([i]) * 10) for i in range(4)))
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.size == 10
+    assert os.listdir(tmp_path) == ["a"]
+
+
+def test_segment_cache_rebuilds_index_from_disk(tmp_path):
+    for i, name in enumerate(["old", "mid", "new"]):
+        path = tmp_path / name
+        path.write_bytes(b"z" * 10)
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "partial.tmp").write_bytes(b"junk")
+
+    cache = SegmentCache(str(tmp_path), max_bytes=20)
+    assert cache.size == 20
+    assert sorted(os.listdir(tmp_path)) == ["mid", "new"]
+
+
+def test_segment_cache_forgets_files_deleted_behind_its_back(tmp_path):
+    cache = SegmentCache(str(tmp_path), max_bytes=100)
+    asyncio.run(cache.put("a", b"a" * 10))
+    os.remove(tmp_path / "a")
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.size == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from app.services import firebase_service
+from app.services.firebase_service import parse_sync_cursor, sync_cursor
+
+
+class _Query:
+    """Enough of an RTDB child-ordered query for cursor paging."""
+
+    def __init__(self, data, field):
+        self.data, self.field = data, field
+        self.low = self.high = self.first = None
+
+    def start_at(self, value):
+        self.low = value
+        return self
+
+    def equal_to(self, value):
+        self.low = self.high = value
+        return self
+
+    def limit_to_first(self, n):
+        self.first = n
+        return self
+
+    def get(self):
+        rows = sorted(self.data.items(), key=lambda kv: (kv[1][self.field], kv[0]))
+        rows = [(k, v) for k, v in rows
+                if (self.low is None or v[self.field] >= self.low)
+                and (self.high is None or v[self.field] <= self.high)]
+        return dict(rows[:self.first] if self.first is not None else rows)
+
+
+class _Ref:
+    def __init__(self, data):
+        self.data = data
+
+    def order_by_child(self, field):
+        return _Query(self.data, field)
+
+
+@pytest.fixture
+def history(monkeypatch):
+    # A replayed batch: 25 plays sharing one timestamp, between older and newer ones
+    data = {f"old{i}": {"playedAt": 100 + i} for i in range(3)}
+    data.update({f"same{i:02d}": {"playedAt": 500} for i in range(25)})
+    data.update({f"new{i}": {"playedAt": 900 + i} for i in range(4)})
+    monkeypatch.setattr(firebase_service, "get_db_ref", lambda path: _Ref(data))
+    return data
+
+
+def test_pages_through_entries_sharing_a_timestamp(history):
+    seen, cursor = [], "0"
+    for _ in range(20):
+        page = firebase_service.get_history("u", limit=10, since=cursor)
+        seen.extend(page)
+        cursor = sync_cursor(page, "playedAt", cursor)
+        if len(page) < 10:
+            break
+    assert sorted(seen) == sorted(history)
+    assert len(seen) == len(history)
+
+
+def test_cursor_is_unchanged_without_new_entries(history):
+    cursor = sync_cursor(history, "playedAt", None)
+    assert cursor == "903:new3"
+    assert firebase_service.get_history("u", limit=10, since=cursor) == {}
+    assert sync_cursor({}, "playedAt", cursor) == cursor
+
+
+def test_bare_timestamp_skips_everything_at_it(history):
+    page = firebase_service.get_history("u", limit=50, since="500")
+    assert sorted(page) == [f"new{i}" for i in range(4)]
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "12:", "x:key"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        parse_sync_cursor(cursor)